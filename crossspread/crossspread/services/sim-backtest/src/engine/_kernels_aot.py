@@ -0,0 +1,38 @@
+"""
+Ahead-of-time build of the backtest numeric kernels.
+
+Compiles the kernels in kernels.py into the _kernels_compiled extension
+module so the engine does not pay JIT latency on first use. Run from the
+service's src directory as part of the image/install step:
+
+    python -m engine._kernels_aot
+
+kernels.py imports the compiled module when present and falls back to
+JIT compilation otherwise.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from .kernels import WALK_BOOK_SIGNATURE, _compute_features, _scan_spreads, _walk_book
+
+
+cc = CC("_kernels_compiled")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export(
+    "scan_spreads",
+    "Tuple((int64, int64, float64))(float64[:], float64[:])"
+)(_scan_spreads)
+
+cc.export(
+    "compute_features",
+    "UniTuple(float64, 5)(float64[:], float64[:], float64[:], float64[:], int64)"
+)(_compute_features)
+
+cc.export("walk_book", WALK_BOOK_SIGNATURE)(_walk_book)
+
+
+if __name__ == "__main__":
+    cc.compile()
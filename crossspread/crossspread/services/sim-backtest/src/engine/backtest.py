@@ -7,52 +7,126 @@ Provides full backtesting capability including:
 - Performance metrics calculation
 """
 
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Optional, List, Dict, Callable, Any
+from typing import Optional, List, Dict, Callable, Any, Tuple, Set
 from enum import Enum
 import asyncio
+import math
+import multiprocessing
+import threading
 
+import numpy as np
 from structlog import get_logger
 
-from .orderbook import OrderbookSnapshot, OrderbookPlayback, InMemoryOrderbookStore
+from .kernels import AOT_COMPILED, UNROLLED_SCAN_MAX_EXCHANGES, make_unrolled_scan, scan_spreads
+from .orderbook import OrderbookSnapshot, OrderbookPlayback, InMemoryOrderbookStore, timestamp_to_ns
 from .simulator import SimulatedExchange, SimulatedOrder, SimulatedFill, OrderSide, OrderType
 from .slippage import SlippageCalculator, TradeSide
 
 logger = get_logger(__name__)
 
+# Decimal constants, hoisted to avoid re-parsing literals in hot paths
+_ZERO = Decimal("0")
+_HUNDRED = Decimal("100")
+
+# Initial capacity of the equity curve arrays (doubled when full)
+EQUITY_CURVE_INITIAL_CAPACITY = 4096
+
+
+def to_decimal(value: float) -> Decimal:
+    """Convert an engine-internal float to Decimal at the result boundary."""
+    return Decimal(str(value))
+
+
+def _aggregate_trades(result: "BacktestResult"):
+    """Fill trade counts and P&L totals on a result in a single pass over its trades."""
+    result.total_trades = len(result.trades)
+    
+    n_win = n_loss = 0
+    gross = fees = net = gross_profit = gross_loss = 0.0
+    for t in result.trades:
+        gross += t.gross_pnl
+        fees += t.fees
+        net += t.net_pnl
+        if t.net_pnl > 0:
+            n_win += 1
+            gross_profit += t.net_pnl
+        elif t.net_pnl < 0:
+            n_loss += 1
+            gross_loss -= t.net_pnl
+    
+    result.winning_trades = n_win
+    result.losing_trades = n_loss
+    result.gross_pnl = to_decimal(gross)
+    result.total_fees = to_decimal(fees)
+    result.net_pnl = to_decimal(net)
+    result.gross_profit = to_decimal(gross_profit)
+    result.gross_loss = to_decimal(gross_loss)
+
+
+# Event loop per worker thread, kept across the thread's backtests
+_worker_state = threading.local()
+
+
+def run_backtest_process(config: "BacktestConfig") -> Tuple["BacktestResult", np.ndarray, np.ndarray]:
+    """
+    Run a backtest in a worker process.
+    
+    Every backtest on the worker's thread runs on the same event loop, so
+    they share its database pools (db.get_pool binds pools to a loop);
+    the pools live as long as the worker.
+    
+    Returns:
+        Tuple of (result, equity timestamps ns, equity values)
+    """
+    loop = getattr(_worker_state, "loop", None)
+    if loop is None:
+        loop = _worker_state.loop = asyncio.new_event_loop()
+    
+    engine = BacktestEngine(config)
+    result = loop.run_until_complete(engine.run())
+    curve = engine.equity_curve
+    return result, curve["timestamp_ns"].copy(), curve["equity"].copy()
+
 
 class TradeDirection(Enum):
     LONG_SHORT = "long_short"  # Long exchange A, short exchange B
     SHORT_LONG = "short_long"  # Short exchange A, long exchange B
 
 
-@dataclass
+@dataclass(slots=True)
 class SpreadTrade:
-    """A spread trade with two legs."""
+    """
+    A spread trade with two legs.
+    
+    Prices, sizes and P&L are native floats so the per-snapshot hot loop
+    avoids Decimal arithmetic; use `to_decimal` when exporting.
+    """
     trade_id: str
     canonical_symbol: str
     long_exchange: str
     short_exchange: str
     entry_time: datetime
-    size_in_coins: Decimal
+    size_in_coins: float
     
     # Entry details
-    long_entry_price: Optional[Decimal] = None
-    short_entry_price: Optional[Decimal] = None
-    entry_spread_bps: Optional[Decimal] = None
+    long_entry_price: Optional[float] = None
+    short_entry_price: Optional[float] = None
+    entry_spread_bps: Optional[float] = None
     
     # Exit details
     exit_time: Optional[datetime] = None
-    long_exit_price: Optional[Decimal] = None
-    short_exit_price: Optional[Decimal] = None
-    exit_spread_bps: Optional[Decimal] = None
+    long_exit_price: Optional[float] = None
+    short_exit_price: Optional[float] = None
+    exit_spread_bps: Optional[float] = None
     
     # P&L
-    gross_pnl: Decimal = Decimal("0")
-    fees: Decimal = Decimal("0")
-    net_pnl: Decimal = Decimal("0")
+    gross_pnl: float = 0.0
+    fees: float = 0.0
+    net_pnl: float = 0.0
     
     # Status
     is_open: bool = True
@@ -65,16 +139,16 @@ class SpreadTrade:
         return None
     
     @property
-    def pnl_bps(self) -> Decimal:
+    def pnl_bps(self) -> float:
         """P&L in basis points relative to notional."""
         if self.long_entry_price and self.size_in_coins:
             notional = self.size_in_coins * self.long_entry_price
             if notional > 0:
-                return (self.net_pnl / notional) * Decimal("10000")
-        return Decimal("0")
+                return (self.net_pnl / notional) * 10000.0
+        return 0.0
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestConfig:
     """Configuration for a backtest run."""
     # Data range
@@ -100,11 +174,15 @@ class BacktestConfig:
     slice_count: int = 5
     slice_interval_ms: int = 100
     
+    # Metrics
+    equity_sample_interval_ms: int = 1000  # Equity curve sampling cadence (0 = every snapshot)
+    
     # Database
     db_url: str = ""
+    playback_cache_dir: Optional[str] = None  # Parquet replay cache (None = always read the DB)
 
 
-@dataclass
+@dataclass(slots=True)
 class BacktestResult:
     """Results from a backtest run."""
     config: BacktestConfig
@@ -125,6 +203,8 @@ class BacktestResult:
     gross_pnl: Decimal = Decimal("0")
     total_fees: Decimal = Decimal("0")
     net_pnl: Decimal = Decimal("0")
+    gross_profit: Decimal = Decimal("0")  # Sum of winning trades' net P&L
+    gross_loss: Decimal = Decimal("0")    # Absolute sum of losing trades' net P&L
     
     # Risk metrics
     max_drawdown: Decimal = Decimal("0")
@@ -141,26 +221,45 @@ class BacktestResult:
     def win_rate(self) -> Decimal:
         """Win rate percentage."""
         if self.total_trades == 0:
-            return Decimal("0")
-        return (Decimal(self.winning_trades) / Decimal(self.total_trades)) * Decimal("100")
+            return _ZERO
+        return (Decimal(self.winning_trades) / Decimal(self.total_trades)) * _HUNDRED
     
     @property
     def profit_factor(self) -> Optional[Decimal]:
         """Gross profit / gross loss."""
-        gross_profit = sum(t.net_pnl for t in self.trades if t.net_pnl > 0)
-        gross_loss = abs(sum(t.net_pnl for t in self.trades if t.net_pnl < 0))
-        if gross_loss > 0:
-            return gross_profit / gross_loss
+        if self.gross_loss > 0:
+            return self.gross_profit / self.gross_loss
         return None
     
     @property
     def avg_trade_pnl(self) -> Decimal:
         """Average P&L per trade."""
         if self.total_trades == 0:
-            return Decimal("0")
+            return _ZERO
         return self.net_pnl / Decimal(self.total_trades)
 
 
+@dataclass(slots=True)
+class _ReturnStats:
+    """Streaming per-trade return stats (Welford mean/M2, downside sum of squares)."""
+    n: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    down_n: int = 0
+    down_sq: float = 0.0
+    
+    def observe(self, pnl: float):
+        """Fold one trade's net P&L into the stats."""
+        self.n += 1
+        delta = pnl - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (pnl - self.mean)
+        
+        if pnl < 0:
+            self.down_n += 1
+            self.down_sq += pnl * pnl
+
+
 class BacktestEngine:
     """
     Main backtest engine for spread trading.
@@ -182,22 +281,72 @@ class BacktestEngine:
         for exchange in config.exchanges:
             self.exchanges[exchange] = SimulatedExchange(exchange)
         
+        # Few exchanges: a generated unrolled scan avoids JIT warmup entirely.
+        # Otherwise compile (or load cached) the scan kernel up front.
+        if not AOT_COMPILED and len(config.exchanges) <= UNROLLED_SCAN_MAX_EXCHANGES:
+            self._scan = make_unrolled_scan(len(config.exchanges))
+        else:
+            self._scan = scan_spreads
+            scan_spreads(np.ones(2), np.ones(2))
+        
+        # Float copies of config thresholds for the hot loop
+        self._size = float(config.size_in_coins)
+        self._entry_threshold_bps = float(config.entry_spread_threshold_bps)
+        self._exit_threshold_bps = float(config.exit_spread_threshold_bps)
+        self._max_slippage_bps = float(config.max_slippage_bps)
+        
         # State
         self.orderbook_store = InMemoryOrderbookStore()
         self.slippage_calc = SlippageCalculator()
         self.open_positions: Dict[str, SpreadTrade] = {}
         self.closed_positions: List[SpreadTrade] = []
+        self._open_by_symbol: Dict[str, List[SpreadTrade]] = {}
+        
+        # Run counters
+        self._trade_seq = 0
+        self._snapshot_count = 0
+        self._spread_sum = 0.0
+        self._slippage_sum = 0.0
+        
+        # Last full scan per symbol: (long_idx, short_idx, bids, asks, spread_info)
+        self._last_best_by_symbol: Dict[str, Tuple[int, int, np.ndarray, np.ndarray, Dict[str, Any]]] = {}
         
         # Metrics tracking
-        self.equity_curve: List[Dict[str, Any]] = []
-        self.peak_equity = Decimal("0")
-        self.current_equity = Decimal("0")
+        self._realized_pnl = 0.0  # Running net P&L of closed trades
+        
+        self._returns = _ReturnStats()
+        self.peak_equity = 0.0
+        self.current_equity = 0.0
+        self._unrealized_by_trade: Dict[str, float] = {}
+        self._unrealized_sum = 0.0
+        self._equity_interval = timedelta(milliseconds=config.equity_sample_interval_ms)
+        self._last_equity_ts: Optional[datetime] = None
+        self._last_snapshot_ts: Optional[datetime] = None
+        self._dirty_symbols: Set[str] = set()  # Symbols updated since the last equity sample
+        
+        # Equity curve as parallel arrays (timestamp ns, equity, peak, drawdown)
+        self._eq_len = 0
+        self._eq_ts = np.empty(EQUITY_CURVE_INITIAL_CAPACITY, dtype=np.int64)
+        self._eq_val = np.empty(EQUITY_CURVE_INITIAL_CAPACITY, dtype=np.float64)
+        self._eq_peak = np.empty(EQUITY_CURVE_INITIAL_CAPACITY, dtype=np.float64)
+        self._eq_dd = np.empty(EQUITY_CURVE_INITIAL_CAPACITY, dtype=np.float64)
         
         # Callbacks
         self._on_trade_open: Optional[Callable[[SpreadTrade], None]] = None
         self._on_trade_close: Optional[Callable[[SpreadTrade], None]] = None
         self._on_snapshot: Optional[Callable[[OrderbookSnapshot], None]] = None
     
+    @property
+    def equity_curve(self) -> Dict[str, np.ndarray]:
+        """Equity curve as views over the recorded points."""
+        n = self._eq_len
+        return {
+            "timestamp_ns": self._eq_ts[:n],
+            "equity": self._eq_val[:n],
+            "peak": self._eq_peak[:n],
+            "drawdown": self._eq_dd[:n],
+        }
+    
     def on_trade_open(self, callback: Callable[[SpreadTrade], None]):
         """Register callback for trade opens."""
         self._on_trade_open = callback
@@ -234,51 +383,22 @@ class BacktestEngine:
             symbols=self.config.symbols,
             start_time=self.config.start_time,
             end_time=self.config.end_time,
+            cache_dir=self.config.playback_cache_dir,
         )
         
         await playback.connect()
         
         try:
-            snapshot_count = 0
-            spread_sum = Decimal("0")
-            slippage_sum = Decimal("0")
+            async for batch in playback.batches():
+                self._process_batch(batch)
             
-            async for snapshot in playback:
-                snapshot_count += 1
-                
-                # Update orderbook store
-                self.orderbook_store.update(snapshot)
-                
-                # Update simulated exchanges
-                if snapshot.exchange in self.exchanges:
-                    self.exchanges[snapshot.exchange].update_orderbook(snapshot)
-                
-                # Check for exit conditions on open positions
-                await self._check_exits(snapshot)
-                
-                # Look for new spread opportunities
-                spread_info = await self._find_spread_opportunity(snapshot)
-                
-                if spread_info:
-                    spread_sum += spread_info.get("spread_bps", Decimal("0"))
-                    
-                    # Check if we should enter
-                    if self._should_enter(spread_info):
-                        trade = await self._enter_spread(spread_info, snapshot.timestamp)
-                        if trade:
-                            slippage_sum += spread_info.get("total_slippage_bps", Decimal("0"))
-                
-                # Track equity
-                self._update_equity(snapshot.timestamp)
-                
-                if self._on_snapshot:
-                    self._on_snapshot(snapshot)
-                
-                # Progress logging
-                if snapshot_count % 10000 == 0:
-                    logger.debug("backtest_progress", snapshots=snapshot_count)
+            # Sample the end state: exits and marks since the last sample
+            # would otherwise miss the curve and the drawdown
+            if self._last_snapshot_ts is not None and self._last_snapshot_ts != self._last_equity_ts:
+                self._update_equity(self._last_snapshot_ts)
+                self._last_equity_ts = self._last_snapshot_ts
             
-            result.total_snapshots_processed = snapshot_count
+            result.total_snapshots_processed = self._snapshot_count
             
         finally:
             await playback.close()
@@ -286,21 +406,20 @@ class BacktestEngine:
         # Finalize results
         result.run_end = datetime.utcnow()
         result.trades = self.closed_positions + list(self.open_positions.values())
-        result.total_trades = len(result.trades)
-        result.winning_trades = sum(1 for t in result.trades if t.net_pnl > 0)
-        result.losing_trades = sum(1 for t in result.trades if t.net_pnl < 0)
-        result.gross_pnl = sum(t.gross_pnl for t in result.trades)
-        result.total_fees = sum(t.fees for t in result.trades)
-        result.net_pnl = sum(t.net_pnl for t in result.trades)
+        _aggregate_trades(result)
+        for trade in self.open_positions.values():
+            self._returns.observe(trade.net_pnl)
         
         if result.total_snapshots_processed > 0:
-            result.avg_spread_bps = spread_sum / Decimal(result.total_snapshots_processed)
+            result.avg_spread_bps = to_decimal(self._spread_sum / result.total_snapshots_processed)
         
         if result.total_trades > 0:
-            result.avg_slippage_bps = slippage_sum / Decimal(result.total_trades)
+            result.avg_slippage_bps = to_decimal(self._slippage_sum / result.total_trades)
         
         # Calculate risk metrics
-        self._calculate_risk_metrics(result)
+        self._calculate_risk_metrics(
+            result, self._eq_dd[:self._eq_len], self.peak_equity, self._returns
+        )
         
         logger.info(
             "backtest_complete",
@@ -312,7 +431,138 @@ class BacktestEngine:
         
         return result
     
-    async def _find_spread_opportunity(self, snapshot: OrderbookSnapshot) -> Optional[Dict[str, Any]]:
+    def _process_batch(self, batch: List[OrderbookSnapshot]):
+        """
+        Process a batch of snapshots in playback order.
+        
+        Args:
+            batch: Chronologically ordered snapshots
+        """
+        for snapshot in batch:
+            self._snapshot_count += 1
+            
+            # Update orderbook store
+            self.orderbook_store.update(snapshot)
+            
+            # Update simulated exchanges
+            if snapshot.exchange in self.exchanges:
+                self.exchanges[snapshot.exchange].update_orderbook(snapshot)
+            
+            # Check for exit conditions on open positions
+            self._check_exits(snapshot)
+            
+            # Look for new spread opportunities
+            spread_info = self._find_spread_opportunity(snapshot)
+            
+            if spread_info:
+                self._spread_sum += spread_info["spread_bps"]
+                
+                # Check if we should enter
+                if self._should_enter(spread_info):
+                    trade = self._enter_spread(spread_info, snapshot.timestamp)
+                    if trade:
+                        self._slippage_sum += spread_info["total_slippage_bps"]
+            
+            # Track equity at the configured sampling cadence
+            self._dirty_symbols.add(snapshot.symbol)
+            if (
+                self._last_equity_ts is None or
+                snapshot.timestamp - self._last_equity_ts >= self._equity_interval
+            ):
+                self._update_equity(snapshot.timestamp)
+                self._last_equity_ts = snapshot.timestamp
+            
+            if self._on_snapshot:
+                self._on_snapshot(snapshot)
+            
+            # Progress logging
+            if self._snapshot_count % 10000 == 0:
+                logger.debug("backtest_progress", snapshots=self._snapshot_count)
+        
+        if batch:
+            self._last_snapshot_ts = batch[-1].timestamp
+    
+    async def run_parallel(self, max_workers: Optional[int] = None) -> BacktestResult:
+        """
+        Run the backtest with one worker process per symbol.
+        
+        Symbols share no state in the strategy, so each runs as an
+        independent backtest and the results are merged. Position limits
+        apply per symbol and trade/snapshot callbacks are not invoked.
+        Merged metrics are computed from the worker outputs alone; the
+        engine's own equity curve and return stats are left untouched.
+        
+        Args:
+            max_workers: Maximum worker processes (defaults to CPU count)
+            
+        Returns:
+            Merged BacktestResult across all symbols
+        """
+        result = BacktestResult(config=self.config)
+        
+        logger.info(
+            "backtest_parallel_starting",
+            symbols=self.config.symbols,
+            max_workers=max_workers
+        )
+        
+        loop = asyncio.get_running_loop()
+        # Spawn: forking from inside a running event loop breaks the event loop in the child
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            outputs = await asyncio.gather(*[
+                loop.run_in_executor(
+                    executor, run_backtest_process, replace(self.config, symbols=[symbol])
+                )
+                for symbol in self.config.symbols
+            ])
+        
+        returns = _ReturnStats()
+        spread_sum = 0.0
+        slippage_sum = 0.0
+        for symbol, (sub, _, _) in zip(self.config.symbols, outputs):
+            # Trade ids are per-worker counters; qualify them with the symbol
+            for trade in sub.trades:
+                trade.trade_id = f"{symbol}:{trade.trade_id}"
+            result.trades.extend(sub.trades)
+            for trade in sub.trades:
+                returns.observe(trade.net_pnl)
+            result.total_snapshots_processed += sub.total_snapshots_processed
+            spread_sum += float(sub.avg_spread_bps) * sub.total_snapshots_processed
+            slippage_sum += float(sub.avg_slippage_bps) * sub.total_trades
+        
+        result.run_end = datetime.utcnow()
+        _aggregate_trades(result)
+        
+        if result.total_snapshots_processed > 0:
+            result.avg_spread_bps = to_decimal(spread_sum / result.total_snapshots_processed)
+        
+        if result.total_trades > 0:
+            result.avg_slippage_bps = to_decimal(slippage_sum / result.total_trades)
+        
+        # Portfolio equity: merge per-symbol curves by timestamp via their increments
+        timestamps = np.concatenate([ts for _, ts, _ in outputs])
+        deltas = np.concatenate([np.diff(eq, prepend=0.0) for _, _, eq in outputs])
+        order = np.argsort(timestamps, kind="stable")
+        equity = np.cumsum(deltas[order])
+        peak = np.maximum.accumulate(np.maximum(equity, 0.0))
+        peak_equity = float(peak[-1]) if len(peak) else 0.0
+        
+        self._calculate_risk_metrics(result, peak - equity, peak_equity, returns)
+        
+        logger.info(
+            "backtest_parallel_complete",
+            trades=result.total_trades,
+            win_rate=str(result.win_rate),
+            net_pnl=str(result.net_pnl),
+            sharpe=str(result.sharpe_ratio)
+        )
+        
+        return result
+    
+    def _find_spread_opportunity(self, snapshot: OrderbookSnapshot) -> Optional[Dict[str, Any]]:
         """
         Find spread opportunity for a symbol across exchanges.
         
@@ -323,81 +573,52 @@ class BacktestEngine:
             Spread info dict if opportunity found
         """
         symbol = snapshot.symbol
-        books = self.orderbook_store.get_all_for_symbol(symbol)
+        exchanges, bids, asks = self.orderbook_store.get_top_of_book(symbol)
         
-        if len(books) < 2:
+        if len(exchanges) < 2:
             return None
         
-        best_spread = None
-        best_spread_bps = Decimal("-inf")
+        # The previous champion stays optimal if the updated exchange is not
+        # one of its legs and neither its bid rose nor its ask fell since the
+        # last full scan (NaN compares False and forces a rescan).
+        cached = self._last_best_by_symbol.get(symbol)
+        if cached is not None:
+            best_i, best_j, scan_bids, scan_asks, spread_info = cached
+            e = self.orderbook_store.get_exchange_index(symbol, snapshot.exchange)
+            if (
+                e != best_i and e != best_j and e < len(scan_bids) and
+                bids[e] <= scan_bids[e] and asks[e] >= scan_asks[e]
+            ):
+                return spread_info
+        
+        i, j, best_spread_bps = self._scan(bids, asks)
+        if i < 0:
+            self._last_best_by_symbol.pop(symbol, None)
+            return None
         
-        # Check all exchange pairs
-        exchanges = list(books.keys())
-        for i, ex1 in enumerate(exchanges):
-            for ex2 in exchanges[i+1:]:
-                book1 = books[ex1]
-                book2 = books[ex2]
-                
-                if not book1.best_bid or not book1.best_ask:
-                    continue
-                if not book2.best_bid or not book2.best_ask:
-                    continue
-                
-                # Check both directions
-                # Direction 1: Long ex1, Short ex2
-                spread1 = (book2.best_bid.price - book1.best_ask.price) / book1.best_ask.price * Decimal("10000")
-                
-                # Direction 2: Long ex2, Short ex1
-                spread2 = (book1.best_bid.price - book2.best_ask.price) / book2.best_ask.price * Decimal("10000")
-                
-                if spread1 > spread2 and spread1 > best_spread_bps:
-                    best_spread_bps = spread1
-                    
-                    # Calculate slippage
-                    long_slip = self.slippage_calc.calculate(
-                        book1, TradeSide.BUY, self.config.size_in_coins
-                    )
-                    short_slip = self.slippage_calc.calculate(
-                        book2, TradeSide.SELL, self.config.size_in_coins
-                    )
-                    
-                    best_spread = {
-                        "symbol": symbol,
-                        "long_exchange": ex1,
-                        "short_exchange": ex2,
-                        "long_book": book1,
-                        "short_book": book2,
-                        "spread_bps": spread1,
-                        "long_slippage": long_slip,
-                        "short_slippage": short_slip,
-                        "total_slippage_bps": long_slip.slippage_bps + short_slip.slippage_bps,
-                        "can_execute": not (long_slip.insufficient_liquidity or short_slip.insufficient_liquidity),
-                    }
-                
-                elif spread2 > best_spread_bps:
-                    best_spread_bps = spread2
-                    
-                    long_slip = self.slippage_calc.calculate(
-                        book2, TradeSide.BUY, self.config.size_in_coins
-                    )
-                    short_slip = self.slippage_calc.calculate(
-                        book1, TradeSide.SELL, self.config.size_in_coins
-                    )
-                    
-                    best_spread = {
-                        "symbol": symbol,
-                        "long_exchange": ex2,
-                        "short_exchange": ex1,
-                        "long_book": book2,
-                        "short_book": book1,
-                        "spread_bps": spread2,
-                        "long_slippage": long_slip,
-                        "short_slippage": short_slip,
-                        "total_slippage_bps": long_slip.slippage_bps + short_slip.slippage_bps,
-                        "can_execute": not (long_slip.insufficient_liquidity or short_slip.insufficient_liquidity),
-                    }
-        
-        return best_spread
+        long_ex, short_ex = exchanges[i], exchanges[j]
+        long_book = self.orderbook_store.get(long_ex, symbol)
+        short_book = self.orderbook_store.get(short_ex, symbol)
+        
+        # Slippage only for the winning pair
+        long_slip = self.slippage_calc.calculate_taker(long_book, TradeSide.BUY, self._size)
+        short_slip = self.slippage_calc.calculate_taker(short_book, TradeSide.SELL, self._size)
+        
+        spread_info = {
+            "symbol": symbol,
+            "long_exchange": long_ex,
+            "short_exchange": short_ex,
+            "long_book": long_book,
+            "short_book": short_book,
+            "spread_bps": best_spread_bps,
+            "long_slippage": long_slip,
+            "short_slippage": short_slip,
+            "total_slippage_bps": long_slip.slippage_bps + short_slip.slippage_bps,
+            "can_execute": not (long_slip.insufficient_liquidity or short_slip.insufficient_liquidity),
+        }
+        self._last_best_by_symbol[symbol] = (i, j, bids.copy(), asks.copy(), spread_info)
+        
+        return spread_info
     
     def _should_enter(self, spread_info: Dict[str, Any]) -> bool:
         """Check if we should enter a spread trade."""
@@ -406,11 +627,11 @@ class BacktestEngine:
             return False
         
         # Check spread threshold
-        if spread_info["spread_bps"] < self.config.entry_spread_threshold_bps:
+        if spread_info["spread_bps"] < self._entry_threshold_bps:
             return False
         
         # Check slippage
-        if spread_info["total_slippage_bps"] > self.config.max_slippage_bps:
+        if spread_info["total_slippage_bps"] > self._max_slippage_bps:
             return False
         
         # Check liquidity
@@ -425,7 +646,7 @@ class BacktestEngine:
         
         return True
     
-    async def _enter_spread(
+    def _enter_spread(
         self,
         spread_info: Dict[str, Any],
         timestamp: datetime
@@ -440,26 +661,27 @@ class BacktestEngine:
         Returns:
             Created trade or None if entry failed
         """
-        from uuid import uuid4
-        
         long_slip = spread_info["long_slippage"]
         short_slip = spread_info["short_slippage"]
         
         trade = SpreadTrade(
-            trade_id=str(uuid4()),
+            trade_id=self._next_trade_id(),
             canonical_symbol=spread_info["symbol"],
             long_exchange=spread_info["long_exchange"],
             short_exchange=spread_info["short_exchange"],
             entry_time=timestamp,
-            size_in_coins=self.config.size_in_coins,
+            size_in_coins=self._size,
             long_entry_price=long_slip.actual_price,
             short_entry_price=short_slip.actual_price,
             entry_spread_bps=spread_info["spread_bps"],
-            fees=long_slip.total_cost - long_slip.actual_price * long_slip.filled_quantity +
-                 short_slip.total_cost - short_slip.actual_price * short_slip.filled_quantity,
+            fees=(
+                long_slip.total_cost - long_slip.actual_price * long_slip.filled_quantity +
+                short_slip.total_cost - short_slip.actual_price * short_slip.filled_quantity
+            ),
         )
         
         self.open_positions[trade.trade_id] = trade
+        self._open_by_symbol.setdefault(trade.canonical_symbol, []).append(trade)
         
         logger.debug(
             "spread_trade_entered",
@@ -475,12 +697,21 @@ class BacktestEngine:
         
         return trade
     
-    async def _check_exits(self, snapshot: OrderbookSnapshot):
+    def _next_trade_id(self) -> str:
+        """Return a sequential trade id, unique within this engine."""
+        self._trade_seq += 1
+        return f"t{self._trade_seq}"
+    
+    def _check_exits(self, snapshot: OrderbookSnapshot):
         """Check for exit conditions on open positions."""
-        for trade_id, trade in list(self.open_positions.items()):
-            if trade.canonical_symbol != snapshot.symbol:
-                continue
-            
+        bucket = self._open_by_symbol.get(snapshot.symbol)
+        if not bucket:
+            return
+        
+        # Exits mutate the bucket, so collect them and close after the scan
+        to_close = []
+        
+        for trade in bucket:
             should_exit = False
             exit_reason = ""
             
@@ -492,15 +723,14 @@ class BacktestEngine:
                 continue
             
             # Calculate current spread (inverted - we're closing)
-            if long_book.best_bid and short_book.best_ask:
+            long_bid = long_book.best_bid_px
+            short_ask = short_book.best_ask_px
+            if long_bid is not None and short_ask is not None:
                 # To close: sell long (get bid), buy short (pay ask)
-                current_spread = (
-                    (long_book.best_bid.price - short_book.best_ask.price) / 
-                    short_book.best_ask.price * Decimal("10000")
-                )
+                current_spread = (long_bid - short_ask) / short_ask * 10000.0
                 
                 # Check spread convergence
-                if current_spread >= -self.config.exit_spread_threshold_bps:
+                if current_spread >= -self._exit_threshold_bps:
                     should_exit = True
                     exit_reason = "spread_converged"
             
@@ -511,9 +741,12 @@ class BacktestEngine:
                 exit_reason = "max_hold_time"
             
             if should_exit:
-                await self._exit_spread(trade, snapshot.timestamp, long_book, short_book, exit_reason)
+                to_close.append((trade, long_book, short_book, exit_reason))
+        
+        for trade, long_book, short_book, exit_reason in to_close:
+            self._exit_spread(trade, snapshot.timestamp, long_book, short_book, exit_reason)
     
-    async def _exit_spread(
+    def _exit_spread(
         self,
         trade: SpreadTrade,
         timestamp: datetime,
@@ -524,21 +757,17 @@ class BacktestEngine:
         """Exit a spread trade."""
         # Calculate exit slippage
         # Close long = sell, close short = buy
-        long_exit = self.slippage_calc.calculate(
-            long_book, TradeSide.SELL, trade.size_in_coins
-        )
-        short_exit = self.slippage_calc.calculate(
-            short_book, TradeSide.BUY, trade.size_in_coins
-        )
+        long_exit = self.slippage_calc.calculate_taker(long_book, TradeSide.SELL, self._size)
+        short_exit = self.slippage_calc.calculate_taker(short_book, TradeSide.BUY, self._size)
         
         trade.exit_time = timestamp
         trade.long_exit_price = long_exit.actual_price
         trade.short_exit_price = short_exit.actual_price
         
-        if long_exit.actual_price > 0 and short_exit.actual_price > 0:
+        if trade.long_exit_price > 0 and trade.short_exit_price > 0:
             trade.exit_spread_bps = (
                 (trade.long_exit_price - trade.short_exit_price) / 
-                trade.short_exit_price * Decimal("10000")
+                trade.short_exit_price * 10000.0
             )
         
         # Calculate P&L
@@ -563,6 +792,17 @@ class BacktestEngine:
         # Move to closed
         del self.open_positions[trade.trade_id]
         self.closed_positions.append(trade)
+        self._realized_pnl += trade.net_pnl
+        self._returns.observe(trade.net_pnl)
+        
+        bucket = self._open_by_symbol[trade.canonical_symbol]
+        bucket.remove(trade)
+        if not bucket:
+            del self._open_by_symbol[trade.canonical_symbol]
+        
+        self._unrealized_sum -= self._unrealized_by_trade.pop(trade.trade_id, 0.0)
+        if not self._unrealized_by_trade:
+            self._unrealized_sum = 0.0  # Drop accumulated float drift
         
         logger.debug(
             "spread_trade_exited",
@@ -575,72 +815,102 @@ class BacktestEngine:
             self._on_trade_close(trade)
     
     def _update_equity(self, timestamp: datetime):
-        """Update equity curve."""
-        # Realized P&L from closed trades
-        realized_pnl = sum(t.net_pnl for t in self.closed_positions)
+        """
+        Record an equity curve point.
         
+        Only positions in symbols updated since the last sample are
+        re-marked; other positions keep their cached mark since their
+        books did not change.
+        """
         # Unrealized P&L from open trades (simplified - mark to market)
-        unrealized_pnl = Decimal("0")
-        for trade in self.open_positions.values():
-            long_book = self.orderbook_store.get(trade.long_exchange, trade.canonical_symbol)
-            short_book = self.orderbook_store.get(trade.short_exchange, trade.canonical_symbol)
-            
-            if long_book and long_book.best_bid and short_book and short_book.best_ask:
-                long_mtm = (long_book.best_bid.price - trade.long_entry_price) * trade.size_in_coins
-                short_mtm = (trade.short_entry_price - short_book.best_ask.price) * trade.size_in_coins
-                unrealized_pnl += long_mtm + short_mtm
+        for symbol in self._dirty_symbols:
+            self._mark_symbol(symbol)
+        self._dirty_symbols.clear()
         
-        self.current_equity = realized_pnl + unrealized_pnl
+        self.current_equity = self._realized_pnl + self._unrealized_sum
         
         # Track peak for drawdown
         if self.current_equity > self.peak_equity:
             self.peak_equity = self.current_equity
         
-        self.equity_curve.append({
-            "timestamp": timestamp,
-            "equity": self.current_equity,
-            "peak": self.peak_equity,
-            "drawdown": self.peak_equity - self.current_equity,
-        })
+        n = self._eq_len
+        if n == len(self._eq_val):
+            self._grow_equity_curve()
+        
+        self._eq_ts[n] = timestamp_to_ns(timestamp)
+        self._eq_val[n] = self.current_equity
+        self._eq_peak[n] = self.peak_equity
+        self._eq_dd[n] = self.peak_equity - self.current_equity
+        self._eq_len = n + 1
     
-    def _calculate_risk_metrics(self, result: BacktestResult):
-        """Calculate risk-adjusted performance metrics."""
-        if len(self.equity_curve) < 2:
+    def _mark_symbol(self, symbol: str):
+        """Mark open positions in a symbol to market and update the running total."""
+        for trade in self._open_by_symbol.get(symbol, ()):
+            long_book = self.orderbook_store.get(trade.long_exchange, trade.canonical_symbol)
+            short_book = self.orderbook_store.get(trade.short_exchange, trade.canonical_symbol)
+            
+            if (
+                long_book and long_book.best_bid_px is not None and
+                short_book and short_book.best_ask_px is not None
+            ):
+                long_mtm = (long_book.best_bid_px - trade.long_entry_price) * trade.size_in_coins
+                short_mtm = (trade.short_entry_price - short_book.best_ask_px) * trade.size_in_coins
+                mtm = long_mtm + short_mtm
+                self._unrealized_sum += mtm - self._unrealized_by_trade.get(trade.trade_id, 0.0)
+                self._unrealized_by_trade[trade.trade_id] = mtm
+    
+    def _grow_equity_curve(self):
+        """Double the capacity of the equity curve arrays."""
+        n = self._eq_len
+        capacity = max(2 * n, EQUITY_CURVE_INITIAL_CAPACITY)
+        for name in ("_eq_ts", "_eq_val", "_eq_peak", "_eq_dd"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:n] = old[:n]
+            setattr(self, name, new)
+    
+    def _calculate_risk_metrics(
+        self,
+        result: BacktestResult,
+        drawdown: np.ndarray,
+        peak_equity: float,
+        returns: _ReturnStats
+    ):
+        """
+        Calculate risk-adjusted performance metrics.
+        
+        Args:
+            result: Result to fill in
+            drawdown: Drawdown at each equity curve point
+            peak_equity: Highest equity reached
+            returns: Per-trade return stats
+        """
+        if len(drawdown) < 2:
             return
         
         # Max drawdown
-        max_dd = Decimal("0")
-        for point in self.equity_curve:
-            dd = point["drawdown"]
-            if dd > max_dd:
-                max_dd = dd
+        max_dd = max(float(drawdown.max()), 0.0)
         
-        result.max_drawdown = max_dd
+        result.max_drawdown = to_decimal(max_dd)
         
-        if self.peak_equity > 0:
-            result.max_drawdown_pct = (max_dd / self.peak_equity) * Decimal("100")
+        if peak_equity > 0:
+            result.max_drawdown_pct = to_decimal((max_dd / peak_equity) * 100.0)
         
-        # Calculate returns for Sharpe
-        if len(result.trades) >= 2:
-            returns = [t.net_pnl for t in result.trades]
-            
-            avg_return = sum(returns) / len(returns)
-            
-            # Standard deviation
-            variance = sum((r - avg_return) ** 2 for r in returns) / len(returns)
-            std_dev = variance ** Decimal("0.5")
+        # Sharpe/Sortino from the streaming per-trade return stats
+        n = returns.n
+        if n >= 2:
+            avg_return = returns.mean
+            std_dev = math.sqrt(returns.m2 / n)
             
             if std_dev > 0:
                 # Annualize assuming 252 trading days
-                trades_per_day = len(result.trades) / max(1, (self.config.end_time - self.config.start_time).days)
-                annualization_factor = Decimal(str((252 * trades_per_day) ** 0.5))
+                trades_per_day = n / max(1, (self.config.end_time - self.config.start_time).days)
+                annualization_factor = math.sqrt(252 * trades_per_day)
                 
-                result.sharpe_ratio = (avg_return / std_dev) * annualization_factor
+                result.sharpe_ratio = to_decimal((avg_return / std_dev) * annualization_factor)
                 
                 # Sortino (downside deviation only)
-                downside_returns = [r for r in returns if r < 0]
-                if downside_returns:
-                    downside_variance = sum(r ** 2 for r in downside_returns) / len(downside_returns)
-                    downside_std = downside_variance ** Decimal("0.5")
+                if returns.down_n:
+                    downside_std = math.sqrt(returns.down_sq / returns.down_n)
                     if downside_std > 0:
-                        result.sortino_ratio = (avg_return / downside_std) * annualization_factor
+                        result.sortino_ratio = to_decimal((avg_return / downside_std) * annualization_factor)
@@ -0,0 +1,86 @@
+"""
+Shared asyncpg connection pools.
+
+Playback instances borrow a pool from here instead of creating and tearing
+down their own on every backtest. Pools are bound to the event loop that
+created them, so they are cached per running loop and per database URL.
+"""
+
+import asyncio
+import weakref
+from typing import Dict
+
+import asyncpg
+import orjson
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 10
+
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+async def init_connection(conn: asyncpg.Connection):
+    """Decode JSONB columns with orjson so rows arrive as Python lists."""
+    await conn.set_type_codec(
+        "jsonb",
+        encoder=lambda value: orjson.dumps(value).decode(),
+        decoder=orjson.loads,
+        schema="pg_catalog",
+        format="text"
+    )
+
+
+async def get_pool(db_url: str) -> asyncpg.Pool:
+    """
+    Get the shared pool for a database URL, creating it on first use.
+
+    Concurrent callers on the same loop wait on a single pool creation.
+
+    Args:
+        db_url: PostgreSQL connection URL
+
+    Returns:
+        Connection pool owned by this module
+    """
+    loop = asyncio.get_running_loop()
+    pools = _pools.setdefault(loop, {})
+
+    task = pools.get(db_url)
+    if task is not None and task.done():
+        if task.cancelled() or task.exception() is not None or task.result().is_closing():
+            task = None
+
+    if task is None:
+        task = loop.create_task(asyncpg.create_pool(
+            db_url,
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            init=init_connection
+        ))
+        pools[db_url] = task
+        logger.info("db_pool_created", db_url=db_url[:30] + "...")
+
+    try:
+        return await asyncio.shield(task)
+    except Exception:
+        if pools.get(db_url) is task:
+            del pools[db_url]
+        raise
+
+
+async def close_pools():
+    """Close every pool created on the running event loop."""
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for task in pools.values():
+        try:
+            pool = await task
+        except Exception:
+            continue
+        await pool.close()
+    if pools:
+        logger.info("db_pools_closed", count=len(pools))
@@ -0,0 +1,261 @@
+"""
+Numba-compiled numeric kernels for the backtest hot loop.
+
+Kernels operate on plain float64 arrays so they can be JIT-compiled
+without touching Python objects. If the ahead-of-time build from
+_kernels_aot.py is present it is used instead, avoiding JIT warmup.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+def _scan_spreads(bids, asks):
+    """
+    Find the best long/short exchange pair from top-of-book prices.
+    
+    Args:
+        bids: Best bid per exchange (NaN if the book is unusable)
+        asks: Best ask per exchange (NaN if the book is unusable)
+        
+    Returns:
+        Tuple of (long_index, short_index, spread_bps); indices are -1
+        if no valid pair exists.
+    """
+    n = bids.shape[0]
+    best_i = -1
+    best_j = -1
+    best_spread = -np.inf
+    
+    for i in range(n):
+        ask = asks[i]
+        if np.isnan(ask):
+            continue
+        for j in range(n):
+            if i == j:
+                continue
+            bid = bids[j]
+            if np.isnan(bid):
+                continue
+            spread = (bid - ask) / ask * 10000.0
+            if spread > best_spread:
+                best_spread = spread
+                best_i = i
+                best_j = j
+    
+    return best_i, best_j, best_spread
+
+
+def _compute_features(bid_px, bid_qty, ask_px, ask_qty, depth_levels):
+    """
+    Compute per-snapshot orderbook features from level arrays.
+    
+    Args:
+        bid_px: Bid prices, best first
+        bid_qty: Bid quantities
+        ask_px: Ask prices, best first
+        ask_qty: Ask quantities
+        depth_levels: Number of levels to include in the depth sums
+        
+    Returns:
+        Tuple of (mid, spread_bps, bid_depth, ask_depth, microprice);
+        price features are NaN unless both sides are present.
+    """
+    bid_depth = 0.0
+    for k in range(min(depth_levels, bid_qty.shape[0])):
+        bid_depth += bid_qty[k]
+    
+    ask_depth = 0.0
+    for k in range(min(depth_levels, ask_qty.shape[0])):
+        ask_depth += ask_qty[k]
+    
+    if bid_px.shape[0] == 0 or ask_px.shape[0] == 0:
+        return np.nan, np.nan, bid_depth, ask_depth, np.nan
+    
+    bid = bid_px[0]
+    ask = ask_px[0]
+    mid = (bid + ask) / 2.0
+    spread_bps = (ask - bid) / mid * 10000.0
+    
+    # Top-of-book quantity weighted price, leaning toward the thinner side
+    top_qty = bid_qty[0] + ask_qty[0]
+    if top_qty > 0:
+        microprice = (bid * ask_qty[0] + ask * bid_qty[0]) / top_qty
+    else:
+        microprice = mid
+    
+    return mid, spread_bps, bid_depth, ask_depth, microprice
+
+
+# Relative shortfall below which an order counts as fully filled: summing
+# level quantities in floats can leave a rounding error unfilled on an
+# order that exactly uses up the book
+FILL_TOLERANCE = 1e-9
+
+# Explicit signature shared by the eager JIT and AOT builds of walk_book
+WALK_BOOK_SIGNATURE = "UniTuple(float64, 4)(float64[:], float64[:], float64, float64)"
+
+
+def _walk_book(prices, qtys, size, fee_bps):
+    """
+    Fill one order against one book side, best level first.
+    
+    The per-level update has no side or fee branches (min() compiles to a
+    select); the only branch left is the exit once the order is filled.
+    
+    Args:
+        prices: Level prices
+        qtys: Level quantities
+        size: Order size
+        fee_bps: Fee charged on the notional, in basis points (0 for none)
+        
+    Returns:
+        Tuple of (filled, notional, cost, unfilled), where notional is the
+        value of the filled quantity and cost is notional plus fees.
+    """
+    fee_rate = fee_bps / 10000.0
+    tolerance = size * FILL_TOLERANCE
+    remaining = size
+    notional = 0.0
+    
+    for k in range(prices.shape[0]):
+        if remaining <= tolerance:
+            break
+        take = min(qtys[k], remaining)
+        notional += prices[k] * take
+        remaining -= take
+    
+    if remaining <= tolerance:
+        remaining = 0.0
+    return size - remaining, notional, notional + notional * fee_rate, remaining
+
+
+def _walk_books(prices, qtys, starts, lens, sizes):
+    """
+    Fill one order per book side across a ragged batch of book sides.
+    
+    Book side i occupies prices/qtys[starts[i]:starts[i] + lens[i]],
+    best level first.
+    
+    Args:
+        prices: Level prices of all book sides, concatenated
+        qtys: Level quantities of all book sides, concatenated
+        starts: Offset of each book side in prices/qtys
+        lens: Level count of each book side
+        sizes: Order size for each book side
+        
+    Returns:
+        Tuple of (vwap, filled) arrays aligned with sizes; vwap is 0
+        where nothing fills.
+    """
+    n = sizes.shape[0]
+    vwap = np.zeros(n)
+    filled = np.zeros(n)
+    
+    for i in prange(n):
+        tolerance = sizes[i] * FILL_TOLERANCE
+        remaining = sizes[i]
+        notional = 0.0
+        start = starts[i]
+        for k in range(start, start + lens[i]):
+            if remaining <= tolerance:
+                break
+            take = min(qtys[k], remaining)
+            notional += take * prices[k]
+            remaining -= take
+        
+        if remaining <= tolerance:
+            remaining = 0.0
+        got = sizes[i] - remaining
+        filled[i] = got
+        if got > 0:
+            vwap[i] = notional / got
+    
+    return vwap, filled
+
+
+try:
+    from ._kernels_compiled import scan_spreads, compute_features, walk_book
+    AOT_COMPILED = True
+except ImportError:
+    scan_spreads = njit(cache=True)(_scan_spreads)
+    compute_features = njit(cache=True)(_compute_features)
+    # Compiled eagerly at import for the one signature the callers use
+    walk_book = njit(WALK_BOOK_SIGNATURE, cache=True)(_walk_book)
+    AOT_COMPILED = False
+
+# numba.pycc cannot build parallel kernels, so this one is always JIT-compiled
+walk_books = njit(parallel=True, cache=True)(_walk_books)
+
+
+def warmup():
+    """
+    Call the serial kernels once on tiny inputs so JIT compilation happens up front.
+    
+    walk_books has its own warmup_parallel(), since it must run on the
+    thread that will make the later calls.
+    """
+    px = np.ones(1)
+    qty = np.ones(1)
+    scan_spreads(px, px)
+    compute_features(px, qty, px, qty, 1)
+    walk_book(px, qty, 1.0, 0.0)
+
+
+def warmup_parallel():
+    """
+    Compile walk_books and start its thread pool.
+    
+    Call from the non-daemon thread that serves walk_books calls: the
+    pool cannot be used concurrently from several threads, and starting
+    it from a daemon thread (as some servers run startup hooks) can hang
+    interpreter exit.
+    """
+    one = np.ones(1)
+    walk_books(one, one, np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.int64), one)
+
+
+# Largest exchange count for which the generated scan beats paying JIT
+# warmup; above this the njit call is cheaper than the unrolled pairs.
+UNROLLED_SCAN_MAX_EXCHANGES = 3
+
+
+def make_unrolled_scan(max_exchanges: int):
+    """
+    Generate a pure-Python scan_spreads with the pair loop fully unrolled.
+    
+    The generated function branches on the array length (top-of-book
+    arrays grow as exchanges first appear) and falls back to
+    scan_spreads for arrays longer than max_exchanges. NaN prices need
+    no explicit check: a NaN spread never compares greater than the best.
+    
+    Args:
+        max_exchanges: Largest array length to specialize for
+        
+    Returns:
+        Function with the same signature and result as scan_spreads
+    """
+    lines = [
+        "def scan(bids, asks):",
+        "    n = len(bids)",
+    ]
+    for n in range(2, max_exchanges + 1):
+        lines.append(f"    if n == {n}:")
+        lines.append("        " + ", ".join(f"b{k}" for k in range(n)) + " = bids.tolist()")
+        lines.append("        " + ", ".join(f"a{k}" for k in range(n)) + " = asks.tolist()")
+        lines.append("        best_i = best_j = -1")
+        lines.append("        best = -inf")
+        for i in range(n):
+            for j in range(n):
+                if i == j:
+                    continue
+                lines.append(f"        s = (b{j} - a{i}) / a{i} * 10000.0")
+                lines.append(f"        if s > best: best = s; best_i = {i}; best_j = {j}")
+        lines.append("        return best_i, best_j, best")
+    lines.append("    if n < 2:")
+    lines.append("        return -1, -1, -inf")
+    lines.append("    return fallback(bids, asks)")
+    
+    namespace = {"inf": float("inf"), "fallback": scan_spreads}
+    exec("\n".join(lines), namespace)
+    return namespace["scan"]
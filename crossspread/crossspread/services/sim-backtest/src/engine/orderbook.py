@@ -4,121 +4,330 @@ Orderbook models and playback engine for backtesting.
 Provides L2 orderbook snapshots and historical playback capability.
 """
 
+from contextlib import aclosing
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from decimal import Decimal
-from typing import List, Dict, Optional, Iterator, Callable
+from typing import List, Dict, Optional, AsyncIterator, Callable, Tuple
 from enum import Enum
 import asyncio
-import json
+import hashlib
+import os
+import shutil
+from urllib.parse import urlsplit
 import asyncpg
+import numpy as np
+import polars as pl
 from structlog import get_logger
 
+from .db import get_pool
+from .kernels import compute_features
+
 logger = get_logger(__name__)
 
+# Batches loaded ahead of the consumer during database playback
+PREFETCH_BATCHES = 2
+
+# Levels summed into the depth features
+FEATURE_DEPTH_LEVELS = 10
+
+# Fixed-point scales for OrderbookLevel ticks (1e-8 resolution)
+PRICE_SCALE = 10**8
+QTY_SCALE = 10**8
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+def timestamp_to_ns(ts: datetime) -> int:
+    """Convert a datetime to integer epoch nanoseconds (naive = UTC)."""
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return (ts - _EPOCH) // _ONE_MICROSECOND * 1000
+
+
+def ns_to_timestamp(ts_ns: int) -> datetime:
+    """Convert integer epoch nanoseconds to a naive UTC datetime."""
+    return _EPOCH + timedelta(microseconds=ts_ns // 1000)
+
 
 class OrderbookSide(Enum):
     BID = "bid"
     ASK = "ask"
 
 
-@dataclass
+@dataclass(slots=True)
 class OrderbookLevel:
-    """Single price level in the orderbook."""
-    price: Decimal
-    quantity: Decimal
+    """
+    Single price level in the orderbook, in fixed-point ticks.
     
-    def __post_init__(self):
-        if isinstance(self.price, (int, float, str)):
-            self.price = Decimal(str(self.price))
-        if isinstance(self.quantity, (int, float, str)):
-            self.quantity = Decimal(str(self.quantity))
+    Prices and quantities are integers scaled by PRICE_SCALE/QTY_SCALE so
+    level arithmetic stays in native ints; price/quantity give Decimal
+    values at the boundary.
+    """
+    price_ticks: int
+    qty_ticks: int
+    
+    @property
+    def price(self) -> Decimal:
+        """Price as an exact Decimal."""
+        return Decimal(self.price_ticks) / PRICE_SCALE
+    
+    @property
+    def quantity(self) -> Decimal:
+        """Quantity as an exact Decimal."""
+        return Decimal(self.qty_ticks) / QTY_SCALE
+    
+    @classmethod
+    def from_decimal(cls, price, quantity) -> "OrderbookLevel":
+        """Create a level from Decimal, numeric or string values."""
+        return cls(
+            price_ticks=int(Decimal(str(price)) * PRICE_SCALE),
+            qty_ticks=int(Decimal(str(quantity)) * QTY_SCALE)
+        )
+
+
+@dataclass(slots=True)
+class OrderbookFeatures:
+    """Per-snapshot features computed by the compiled feature kernel."""
+    mid: float
+    spread_bps: float
+    bid_depth: float
+    ask_depth: float
+    microprice: float
+
+
+def to_ticks(values: np.ndarray, scale: int) -> List[int]:
+    """Round float values to fixed-point integer ticks."""
+    return np.rint(values * scale).astype(np.int64).tolist()
+
+
+def _level_arrays(levels) -> Tuple[np.ndarray, np.ndarray]:
+    """Split [[price, qty], ...] (numbers or strings) into price/qty float64 arrays."""
+    arr = np.asarray(levels, dtype=np.float64).reshape(-1, 2)
+    return np.ascontiguousarray(arr[:, 0]), np.ascontiguousarray(arr[:, 1])
 
 
-@dataclass
+@dataclass(eq=False, slots=True)
 class OrderbookSnapshot:
     """
     L2 orderbook snapshot at a specific point in time.
     
+    Levels are stored as parallel float64 arrays (structure of arrays) so
+    depth and spread queries are single vectorized operations.
+    
     Attributes:
         exchange: Exchange identifier (e.g., 'binance', 'bybit')
         symbol: Canonical symbol (e.g., 'BTC-USDT-PERP')
         timestamp: Snapshot timestamp
-        bids: List of bid levels, sorted by price descending
-        asks: List of ask levels, sorted by price ascending
+        bid_px: Bid prices, sorted descending
+        bid_qty: Bid quantities, aligned with bid_px
+        ask_px: Ask prices, sorted ascending
+        ask_qty: Ask quantities, aligned with ask_px
         sequence: Exchange sequence number for ordering
+        best_bid_px: Best bid price (None if no bids)
+        best_ask_px: Best ask price (None if no asks)
+        mid_price: Mid price (None unless both sides are present)
+        spread: Absolute spread (None unless both sides are present)
+        spread_bps: Spread in basis points of mid (None if not computable)
     """
     exchange: str
     symbol: str
     timestamp: datetime
-    bids: List[OrderbookLevel] = field(default_factory=list)
-    asks: List[OrderbookLevel] = field(default_factory=list)
+    bid_px: np.ndarray
+    bid_qty: np.ndarray
+    ask_px: np.ndarray
+    ask_qty: np.ndarray
     sequence: int = 0
     
+    # Top-of-book values, computed once at construction (snapshots are immutable)
+    best_bid_px: Optional[float] = field(default=None, init=False, repr=False)
+    best_ask_px: Optional[float] = field(default=None, init=False, repr=False)
+    mid_price: Optional[float] = field(default=None, init=False, repr=False)
+    spread: Optional[float] = field(default=None, init=False, repr=False)
+    spread_bps: Optional[float] = field(default=None, init=False, repr=False)
+    
+    # Lazily built fixed-point level views for level-walking consumers
+    _bids: Optional[List[OrderbookLevel]] = field(default=None, init=False, repr=False)
+    _asks: Optional[List[OrderbookLevel]] = field(default=None, init=False, repr=False)
+    
+    # Lazily computed epoch-nanosecond timestamp
+    _timestamp_ns: Optional[int] = field(default=None, init=False, repr=False)
+    
+    # Lazily computed kernel features
+    _features: Optional[OrderbookFeatures] = field(default=None, init=False, repr=False)
+    
+    # Lazily built cumulative quantities and notionals for depth/slippage lookups
+    _bid_cum: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+    _ask_cum: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+    _bid_cum_notional: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+    _ask_cum_notional: Optional[np.ndarray] = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self):
+        if len(self.bid_px):
+            self.best_bid_px = float(self.bid_px[0])
+        if len(self.ask_px):
+            self.best_ask_px = float(self.ask_px[0])
+        
+        if self.best_bid_px is not None and self.best_ask_px is not None:
+            self.mid_price = (self.best_bid_px + self.best_ask_px) / 2
+            self.spread = self.best_ask_px - self.best_bid_px
+            if self.mid_price and self.spread:
+                self.spread_bps = (self.spread / self.mid_price) * 10000.0
+    
+    @classmethod
+    def from_levels(
+        cls,
+        exchange: str,
+        symbol: str,
+        timestamp: datetime,
+        bids,
+        asks,
+        sequence: int = 0
+    ) -> "OrderbookSnapshot":
+        """
+        Create snapshot from [[price, quantity], ...] level lists.
+        
+        Args:
+            exchange: Exchange identifier
+            symbol: Canonical symbol
+            timestamp: Snapshot timestamp
+            bids: Bid levels, best first (numbers or numeric strings)
+            asks: Ask levels, best first (numbers or numeric strings)
+            sequence: Exchange sequence number
+        """
+        bid_px, bid_qty = _level_arrays(bids)
+        ask_px, ask_qty = _level_arrays(asks)
+        return cls(
+            exchange=exchange,
+            symbol=symbol,
+            timestamp=timestamp,
+            bid_px=bid_px,
+            bid_qty=bid_qty,
+            ask_px=ask_px,
+            ask_qty=ask_qty,
+            sequence=sequence
+        )
+    
+    @classmethod
+    def from_raw(cls, exchange: str, symbol: str, raw: dict) -> "OrderbookSnapshot":
+        """
+        Create a snapshot, timestamped now, from a raw {"bids": ..., "asks": ...} book.
+        
+        Args:
+            exchange: Exchange identifier
+            symbol: Canonical symbol
+            raw: Mapping with [[price, quantity], ...] bid and ask levels,
+                best first; a missing side is treated as empty
+        """
+        return cls.from_levels(
+            exchange=exchange,
+            symbol=symbol,
+            timestamp=datetime.now(timezone.utc),
+            bids=raw.get("bids", ()),
+            asks=raw.get("asks", ())
+        )
+    
     @property
-    def best_bid(self) -> Optional[OrderbookLevel]:
-        """Get the best (highest) bid."""
-        return self.bids[0] if self.bids else None
+    def bids(self) -> List[OrderbookLevel]:
+        """Legacy view: bid levels as OrderbookLevel objects, sorted by price descending."""
+        if self._bids is None:
+            self._bids = [
+                OrderbookLevel(price_ticks=p, qty_ticks=q)
+                for p, q in zip(
+                    to_ticks(self.bid_px, PRICE_SCALE), to_ticks(self.bid_qty, QTY_SCALE)
+                )
+            ]
+        return self._bids
     
     @property
-    def best_ask(self) -> Optional[OrderbookLevel]:
-        """Get the best (lowest) ask."""
-        return self.asks[0] if self.asks else None
+    def asks(self) -> List[OrderbookLevel]:
+        """Legacy view: ask levels as OrderbookLevel objects, sorted by price ascending."""
+        if self._asks is None:
+            self._asks = [
+                OrderbookLevel(price_ticks=p, qty_ticks=q)
+                for p, q in zip(
+                    to_ticks(self.ask_px, PRICE_SCALE), to_ticks(self.ask_qty, QTY_SCALE)
+                )
+            ]
+        return self._asks
+    
+    @property
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        """Get the best (highest) bid as (price, quantity)."""
+        return (self.best_bid_px, float(self.bid_qty[0])) if len(self.bid_px) else None
     
     @property
-    def mid_price(self) -> Optional[Decimal]:
-        """Calculate mid price."""
-        if self.best_bid and self.best_ask:
-            return (self.best_bid.price + self.best_ask.price) / 2
-        return None
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        """Get the best (lowest) ask as (price, quantity)."""
+        return (self.best_ask_px, float(self.ask_qty[0])) if len(self.ask_px) else None
     
     @property
-    def spread(self) -> Optional[Decimal]:
-        """Calculate absolute spread."""
-        if self.best_bid and self.best_ask:
-            return self.best_ask.price - self.best_bid.price
-        return None
+    def timestamp_ns(self) -> int:
+        """Snapshot timestamp as integer epoch nanoseconds."""
+        if self._timestamp_ns is None:
+            self._timestamp_ns = timestamp_to_ns(self.timestamp)
+        return self._timestamp_ns
     
     @property
-    def spread_bps(self) -> Optional[Decimal]:
-        """Calculate spread in basis points."""
-        if self.mid_price and self.spread:
-            return (self.spread / self.mid_price) * Decimal("10000")
-        return None
+    def features(self) -> OrderbookFeatures:
+        """Mid, spread, top-N depth and microprice, computed once per snapshot."""
+        if self._features is None:
+            self._features = OrderbookFeatures(*compute_features(
+                self.bid_px, self.bid_qty, self.ask_px, self.ask_qty, FEATURE_DEPTH_LEVELS
+            ))
+        return self._features
+    
+    def cumulative_qty(self, side: OrderbookSide) -> np.ndarray:
+        """Cumulative quantity by level for one side, built on first use."""
+        if side == OrderbookSide.BID:
+            if self._bid_cum is None:
+                self._bid_cum = np.cumsum(self.bid_qty)
+            return self._bid_cum
+        
+        if self._ask_cum is None:
+            self._ask_cum = np.cumsum(self.ask_qty)
+        return self._ask_cum
+    
+    def cumulative_notional(self, side: OrderbookSide) -> np.ndarray:
+        """Cumulative price * quantity by level for one side, built on first use."""
+        if side == OrderbookSide.BID:
+            if self._bid_cum_notional is None:
+                self._bid_cum_notional = np.cumsum(self.bid_px * self.bid_qty)
+            return self._bid_cum_notional
+        
+        if self._ask_cum_notional is None:
+            self._ask_cum_notional = np.cumsum(self.ask_px * self.ask_qty)
+        return self._ask_cum_notional
     
-    def depth_at_price(self, side: OrderbookSide, price: Decimal) -> Decimal:
+    def depth_at_price(self, side: OrderbookSide, price: float) -> float:
         """Calculate cumulative depth up to a price level."""
-        levels = self.bids if side == OrderbookSide.BID else self.asks
-        total = Decimal("0")
-        
-        for level in levels:
-            if side == OrderbookSide.BID:
-                if level.price >= price:
-                    total += level.quantity
-                else:
-                    break
-            else:  # ASK
-                if level.price <= price:
-                    total += level.quantity
-                else:
-                    break
+        cum = self.cumulative_qty(side)
+        
+        # Binary search the sorted prices, then read the cumulative quantity
+        if side == OrderbookSide.BID:
+            # Bids are descending: count levels with price >= target
+            idx = len(self.bid_px) - np.searchsorted(self.bid_px[::-1], float(price), side="left")
+        else:
+            idx = np.searchsorted(self.ask_px, float(price), side="right")
         
-        return total
+        return float(cum[idx - 1]) if idx else 0.0
     
-    def total_depth(self, side: OrderbookSide, levels: int = 10) -> Decimal:
+    def total_depth(self, side: OrderbookSide, levels: int = 10) -> float:
         """Calculate total depth for top N levels."""
-        book = self.bids if side == OrderbookSide.BID else self.asks
-        return sum(level.quantity for level in book[:levels])
+        cum = self.cumulative_qty(side)
+        n = min(levels, len(cum))
+        return float(cum[n - 1]) if n > 0 else 0.0
     
     @classmethod
     def from_dict(cls, data: dict) -> "OrderbookSnapshot":
         """Create snapshot from dictionary."""
-        return cls(
+        return cls.from_levels(
             exchange=data["exchange"],
             symbol=data["symbol"],
             timestamp=datetime.fromisoformat(data["timestamp"]) if isinstance(data["timestamp"], str) else data["timestamp"],
-            bids=[OrderbookLevel(price=Decimal(str(b[0])), quantity=Decimal(str(b[1]))) for b in data.get("bids", [])],
-            asks=[OrderbookLevel(price=Decimal(str(a[0])), quantity=Decimal(str(a[1]))) for a in data.get("asks", [])],
+            bids=data.get("bids", []),
+            asks=data.get("asks", []),
             sequence=data.get("sequence", 0)
         )
     
@@ -128,12 +337,79 @@ class OrderbookSnapshot:
             "exchange": self.exchange,
             "symbol": self.symbol,
             "timestamp": self.timestamp.isoformat(),
-            "bids": [[str(b.price), str(b.quantity)] for b in self.bids],
-            "asks": [[str(a.price), str(a.quantity)] for a in self.asks],
+            "bids": [[repr(p), repr(q)] for p, q in zip(self.bid_px.tolist(), self.bid_qty.tolist())],
+            "asks": [[repr(p), repr(q)] for p, q in zip(self.ask_px.tolist(), self.ask_qty.tolist())],
             "sequence": self.sequence
         }
 
 
+_LEVEL_COLUMNS = ("bid_px", "bid_qty", "ask_px", "ask_qty")
+
+
+def _write_snapshot_part(path: str, snapshots: List[OrderbookSnapshot]):
+    """Write a batch of snapshots to a columnar Parquet part file."""
+    frame = pl.DataFrame({
+        "exchange": [s.exchange for s in snapshots],
+        "symbol": [s.symbol for s in snapshots],
+        "timestamp_ns": np.array([timestamp_to_ns(s.timestamp) for s in snapshots], dtype=np.int64),
+        "tz_aware": [s.timestamp.tzinfo is not None for s in snapshots],
+        "sequence": np.array([s.sequence for s in snapshots], dtype=np.int64),
+        **{
+            column: pl.Series(column, [getattr(s, column) for s in snapshots], dtype=pl.List(pl.Float64))
+            for column in _LEVEL_COLUMNS
+        },
+    })
+    frame.write_parquet(path)
+
+
+def _read_snapshot_part(path: str) -> List[OrderbookSnapshot]:
+    """Read a Parquet part file back into snapshots."""
+    frame = pl.read_parquet(path)
+    
+    # Each level column is one flat array plus row offsets; rows are views into it
+    levels = {}
+    for column in _LEVEL_COLUMNS:
+        series = frame[column]
+        offsets = np.zeros(len(series) + 1, dtype=np.int64)
+        np.cumsum(series.list.len().to_numpy(), out=offsets[1:])
+        # Empty lists explode to a null entry; drop those to keep offsets aligned.
+        # to_numpy() is a read-only view, which the kernels' explicit
+        # float64[:] signatures reject, so copy once per column if needed.
+        values = np.require(series.explode().drop_nulls().to_numpy(), np.float64, "W")
+        levels[column] = (values, offsets)
+    
+    (bid_px, bid_off), (bid_qty, _), (ask_px, ask_off), (ask_qty, _) = (
+        levels[column] for column in _LEVEL_COLUMNS
+    )
+    
+    snapshots = []
+    for k, (exchange, symbol, ts_ns, tz_aware, sequence) in enumerate(zip(
+        frame["exchange"].to_list(),
+        frame["symbol"].to_list(),
+        frame["timestamp_ns"].to_list(),
+        frame["tz_aware"].to_list(),
+        frame["sequence"].to_list(),
+    )):
+        timestamp = ns_to_timestamp(ts_ns)
+        if tz_aware:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        
+        b0, b1 = bid_off[k], bid_off[k + 1]
+        a0, a1 = ask_off[k], ask_off[k + 1]
+        snapshots.append(OrderbookSnapshot(
+            exchange=exchange,
+            symbol=symbol,
+            timestamp=timestamp,
+            bid_px=bid_px[b0:b1],
+            bid_qty=bid_qty[b0:b1],
+            ask_px=ask_px[a0:a1],
+            ask_qty=ask_qty[a0:a1],
+            sequence=sequence
+        ))
+    
+    return snapshots
+
+
 class OrderbookPlayback:
     """
     Replays historical orderbook snapshots for backtesting.
@@ -148,7 +424,8 @@ class OrderbookPlayback:
         symbols: List[str],
         start_time: datetime,
         end_time: datetime,
-        batch_size: int = 1000
+        batch_size: int = 1000,
+        cache_dir: Optional[str] = None
     ):
         """
         Initialize playback engine.
@@ -160,6 +437,8 @@ class OrderbookPlayback:
             start_time: Start of playback period
             end_time: End of playback period
             batch_size: Number of snapshots to load per batch
+            cache_dir: Directory for the columnar Parquet replay cache
+                (disabled if None)
         """
         self.db_url = db_url
         self.exchanges = exchanges
@@ -167,115 +446,278 @@ class OrderbookPlayback:
         self.start_time = start_time
         self.end_time = end_time
         self.batch_size = batch_size
+        self.cache_dir = cache_dir
         
+        self._connected = False
         self._pool: Optional[asyncpg.Pool] = None
-        self._current_batch: List[OrderbookSnapshot] = []
-        self._batch_index = 0
-        self._last_timestamp: Optional[datetime] = None
         self._exhausted = False
         
+        # Server-side cursor over the whole range, on a connection held from the pool
+        self._cursor_conn: Optional[asyncpg.Connection] = None
+        self._cursor_tx = None
+        self._cursor = None
+        
+        # Background batch prefetch (started on first read)
+        self._prefetch_queue: asyncio.Queue = asyncio.Queue(maxsize=PREFETCH_BATCHES)
+        self._prefetch_task: Optional[asyncio.Task] = None
+        self._prefetch_done = False
+        
         # Callbacks for event handling
         self._on_snapshot: Optional[Callable[[OrderbookSnapshot], None]] = None
     
     async def connect(self):
-        """Establish database connection pool."""
-        self._pool = await asyncpg.create_pool(self.db_url, min_size=2, max_size=10)
+        """
+        Prepare playback for reading.
+        
+        The shared connection pool is only borrowed once the database is
+        first queried, so replays served from the Parquet cache open no
+        connections.
+        """
+        self._connected = True
         logger.info("orderbook_playback_connected", db_url=self.db_url[:30] + "...")
     
+    async def _get_pool(self) -> asyncpg.Pool:
+        """Borrow the shared connection pool for this database on first use."""
+        if not self._connected:
+            raise RuntimeError("Not connected to database")
+        
+        if self._pool is None:
+            self._pool = await get_pool(self.db_url)
+        return self._pool
+    
     async def close(self):
-        """Close database connection pool."""
-        if self._pool:
-            await self._pool.close()
-            logger.info("orderbook_playback_closed")
+        """
+        Close the playback cursor and return its connection to the pool.
+        
+        The connection pool is shared and stays open; see db.close_pools.
+        """
+        if self._prefetch_task and not self._prefetch_task.done():
+            self._prefetch_task.cancel()
+            try:
+                await self._prefetch_task
+            except asyncio.CancelledError:
+                pass
+        
+        if self._cursor_conn:
+            try:
+                await self._cursor_tx.rollback()
+            finally:
+                await self._pool.release(self._cursor_conn)
+            self._cursor_conn = self._cursor_tx = self._cursor = None
+        
+        self._connected = False
+        self._pool = None
+        logger.info("orderbook_playback_closed")
     
     def on_snapshot(self, callback: Callable[[OrderbookSnapshot], None]):
         """Register callback for each snapshot."""
         self._on_snapshot = callback
     
-    async def _load_batch(self) -> List[OrderbookSnapshot]:
-        """Load next batch of snapshots from database."""
-        if not self._pool:
-            raise RuntimeError("Not connected to database")
+    async def _open_cursor(self):
+        """
+        Open a server-side cursor over the full playback range.
         
-        start_ts = self._last_timestamp or self.start_time
+        Rows stream from a single query instead of re-planning a LIMIT
+        query per batch. Cursors need a transaction, so the cursor holds
+        its pool connection until close().
         
+        Joining against the (exchange, symbol) pairs lets Postgres do one
+        range scan per pair on an index over
+        orderbook_snapshots (exchange, symbol, timestamp) instead of
+        filtering with ANY().
+        """
         query = """
             SELECT 
-                exchange,
-                symbol,
-                timestamp,
-                bids,
-                asks,
-                sequence
-            FROM orderbook_snapshots
-            WHERE timestamp > $1 
-              AND timestamp <= $2
-              AND exchange = ANY($3)
-              AND symbol = ANY($4)
-            ORDER BY timestamp ASC
-            LIMIT $5
+                o.exchange,
+                o.symbol,
+                o.timestamp,
+                o.bids,
+                o.asks,
+                o.sequence
+            FROM unnest($3::text[], $4::text[]) AS p(exchange, symbol)
+            JOIN orderbook_snapshots o
+              ON o.exchange = p.exchange
+             AND o.symbol = p.symbol
+            WHERE o.timestamp > $1 
+              AND o.timestamp <= $2
+            ORDER BY o.timestamp ASC
         """
+        pair_exchanges, pair_symbols = self._pairs()
         
-        async with self._pool.acquire() as conn:
-            rows = await conn.fetch(
-                query,
-                start_ts,
-                self.end_time,
-                self.exchanges,
-                self.symbols,
-                self.batch_size
-            )
+        pool = await self._get_pool()
+        self._cursor_conn = await pool.acquire()
+        self._cursor_tx = self._cursor_conn.transaction(readonly=True)
+        await self._cursor_tx.start()
+        self._cursor = await self._cursor_conn.cursor(
+            query,
+            self.start_time,
+            self.end_time,
+            pair_exchanges,
+            pair_symbols
+        )
+    
+    def _pairs(self) -> Tuple[List[str], List[str]]:
+        """Parallel exchange/symbol lists covering every configured pair."""
+        pairs = [(e, s) for e in self.exchanges for s in self.symbols]
+        return [e for e, _ in pairs], [s for _, s in pairs]
+    
+    async def _load_batch(self) -> List[OrderbookSnapshot]:
+        """Load next batch of snapshots from database."""
+        if self._cursor is None:
+            await self._open_cursor()
+        
+        rows = await self._cursor.fetch(self.batch_size)
         
         snapshots = []
         for row in rows:
             try:
-                snapshot = OrderbookSnapshot(
+                snapshot = OrderbookSnapshot.from_levels(
                     exchange=row["exchange"],
                     symbol=row["symbol"],
                     timestamp=row["timestamp"],
-                    bids=[OrderbookLevel(price=Decimal(str(b[0])), quantity=Decimal(str(b[1]))) 
-                          for b in (json.loads(row["bids"]) if isinstance(row["bids"], str) else row["bids"])],
-                    asks=[OrderbookLevel(price=Decimal(str(a[0])), quantity=Decimal(str(a[1]))) 
-                          for a in (json.loads(row["asks"]) if isinstance(row["asks"], str) else row["asks"])],
+                    bids=row["bids"],
+                    asks=row["asks"],
                     sequence=row["sequence"]
                 )
                 snapshots.append(snapshot)
             except Exception as e:
                 logger.error("failed_to_parse_snapshot", error=str(e), row=dict(row))
         
-        if snapshots:
-            self._last_timestamp = snapshots[-1].timestamp
-            logger.debug("loaded_snapshot_batch", count=len(snapshots), last_ts=self._last_timestamp)
+        if rows:
+            logger.debug("loaded_snapshot_batch", count=len(snapshots), last_ts=rows[-1]["timestamp"])
         else:
             self._exhausted = True
             logger.info("orderbook_playback_exhausted")
         
         return snapshots
     
-    async def __aiter__(self) -> Iterator[OrderbookSnapshot]:
-        """Async iterator over snapshots."""
-        return self
+    async def _prefetch(self):
+        """Load batches ahead of the consumer into the prefetch queue."""
+        try:
+            while not self._exhausted:
+                batch = await self._load_batch()
+                if batch:
+                    await self._prefetch_queue.put(batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Hand the failure to the consumer rather than losing it in the task
+            await self._prefetch_queue.put(e)
+            return
+        
+        await self._prefetch_queue.put(None)
     
-    async def __anext__(self) -> OrderbookSnapshot:
-        """Get next snapshot."""
-        if self._exhausted:
-            raise StopAsyncIteration
+    async def _next_batch(self) -> List[OrderbookSnapshot]:
+        """Get the next prefetched batch (empty once playback is exhausted)."""
+        if self._prefetch_done:
+            return []
         
-        # Load next batch if current is exhausted
-        if self._batch_index >= len(self._current_batch):
-            self._current_batch = await self._load_batch()
-            self._batch_index = 0
-            
-            if not self._current_batch:
-                raise StopAsyncIteration
+        if self._prefetch_task is None:
+            self._prefetch_task = asyncio.create_task(self._prefetch())
         
-        snapshot = self._current_batch[self._batch_index]
-        self._batch_index += 1
+        item = await self._prefetch_queue.get()
+        if item is None:
+            self._prefetch_done = True
+            return []
+        if isinstance(item, Exception):
+            self._prefetch_done = True
+            raise item
+        return item
+    
+    async def __aiter__(self) -> AsyncIterator[OrderbookSnapshot]:
+        """Async iterator over snapshots, streamed out of the playback batches."""
+        # aclosing: an abandoned replay still runs the source's cleanup
+        async with aclosing(self._source_batches()) as source:
+            async for batch in source:
+                for snapshot in batch:
+                    if self._on_snapshot:
+                        self._on_snapshot(snapshot)
+                    yield snapshot
+    
+    async def batches(self) -> AsyncIterator[List[OrderbookSnapshot]]:
+        """
+        Async iterator over whole batches of snapshots.
         
-        if self._on_snapshot:
-            self._on_snapshot(snapshot)
+        Crosses the async boundary once per database batch instead of once
+        per snapshot; consumers iterate each batch synchronously.
+        """
+        async with aclosing(self._source_batches()) as source:
+            async for batch in source:
+                if self._on_snapshot:
+                    for snapshot in batch:
+                        self._on_snapshot(snapshot)
+                
+                yield batch
+    
+    def _source_batches(self) -> AsyncIterator[List[OrderbookSnapshot]]:
+        """
+        Select the batch source for this playback.
+        
+        With a cache_dir, the first full replay of a range is written to
+        Parquet and later replays read it instead of the database.
+        """
+        cache_path = self._cache_path() if self.cache_dir else None
+        
+        if cache_path and os.path.isdir(cache_path):
+            return self._cached_batches(cache_path)
+        return self._db_batches(cache_path)
+    
+    async def _db_batches(self, cache_path: Optional[str]) -> AsyncIterator[List[OrderbookSnapshot]]:
+        """Yield batches from the database, materializing them to cache_path if set."""
+        tmp_path = f"{cache_path}.tmp-{os.getpid()}" if cache_path else None
+        if tmp_path:
+            os.makedirs(tmp_path, exist_ok=True)
         
-        return snapshot
+        published = False
+        try:
+            part = 0
+            while True:
+                batch = await self._next_batch()
+                if not batch:
+                    break
+                
+                if tmp_path:
+                    _write_snapshot_part(os.path.join(tmp_path, f"part-{part:06d}.parquet"), batch)
+                    part += 1
+                
+                yield batch
+            
+            # Only a complete replay is published to the cache
+            if tmp_path:
+                try:
+                    os.rename(tmp_path, cache_path)
+                    published = True
+                    logger.info("orderbook_cache_written", path=cache_path, parts=part)
+                except OSError:
+                    # Another run published the same range first
+                    pass
+        finally:
+            # Aborted, failed or lost the race: the parts are never read
+            if tmp_path and not published:
+                shutil.rmtree(tmp_path, ignore_errors=True)
+    
+    async def _cached_batches(self, cache_path: str) -> AsyncIterator[List[OrderbookSnapshot]]:
+        """Yield batches from a materialized Parquet cache."""
+        logger.info("orderbook_cache_hit", path=cache_path)
+        for name in sorted(os.listdir(cache_path)):
+            batch = await asyncio.to_thread(_read_snapshot_part, os.path.join(cache_path, name))
+            if batch:
+                yield batch
+        self._exhausted = True
+    
+    def _cache_path(self) -> str:
+        """Cache directory for this playback's database and exchange/symbol/time range."""
+        # Database identity without credentials, so rotating a password
+        # keeps the cache
+        db = urlsplit(self.db_url)
+        key = "|".join([
+            f"{db.hostname}:{db.port}{db.path}?{db.query}",
+            ",".join(sorted(self.exchanges)),
+            ",".join(sorted(self.symbols)),
+            self.start_time.isoformat(),
+            self.end_time.isoformat(),
+        ])
+        return os.path.join(self.cache_dir, hashlib.sha1(key.encode()).hexdigest())
     
     async def play(self, speed_multiplier: float = 1.0, realtime: bool = False):
         """
@@ -301,25 +743,25 @@ class OrderbookPlayback:
     
     async def get_snapshot_count(self) -> int:
         """Get total number of snapshots in the date range."""
-        if not self._pool:
-            raise RuntimeError("Not connected to database")
-        
         query = """
             SELECT COUNT(*) 
-            FROM orderbook_snapshots
-            WHERE timestamp >= $1 
-              AND timestamp <= $2
-              AND exchange = ANY($3)
-              AND symbol = ANY($4)
+            FROM unnest($3::text[], $4::text[]) AS p(exchange, symbol)
+            JOIN orderbook_snapshots o
+              ON o.exchange = p.exchange
+             AND o.symbol = p.symbol
+            WHERE o.timestamp >= $1 
+              AND o.timestamp <= $2
         """
+        pair_exchanges, pair_symbols = self._pairs()
         
-        async with self._pool.acquire() as conn:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
             count = await conn.fetchval(
                 query,
                 self.start_time,
                 self.end_time,
-                self.exchanges,
-                self.symbols
+                pair_exchanges,
+                pair_symbols
             )
         
         return count or 0
@@ -329,33 +771,91 @@ class InMemoryOrderbookStore:
     """
     In-memory store for latest orderbooks during simulation.
     
-    Maintains the current state of orderbooks for multiple exchanges/symbols.
+    Maintains the current state of orderbooks for multiple exchanges/symbols,
+    plus per-symbol float64 arrays of top-of-book prices indexed by exchange
+    so cross-exchange scans can run vectorized.
     """
     
     def __init__(self):
-        self._books: Dict[str, Dict[str, OrderbookSnapshot]] = {}
+        self._books: Dict[Tuple[str, str], OrderbookSnapshot] = {}
+        self._by_symbol: Dict[str, Dict[str, OrderbookSnapshot]] = {}
+        
+        # Per-symbol top-of-book arrays; NaN when a side is missing
+        self._top_exchanges: Dict[str, List[str]] = {}
+        self._top_index: Dict[str, Dict[str, int]] = {}
+        self._top_bids: Dict[str, np.ndarray] = {}
+        self._top_asks: Dict[str, np.ndarray] = {}
     
     def _key(self, exchange: str, symbol: str) -> str:
         return f"{exchange}:{symbol}"
     
     def update(self, snapshot: OrderbookSnapshot):
         """Update orderbook for an exchange/symbol pair."""
-        if snapshot.exchange not in self._books:
-            self._books[snapshot.exchange] = {}
-        self._books[snapshot.exchange][snapshot.symbol] = snapshot
+        self._books[(snapshot.exchange, snapshot.symbol)] = snapshot
+        self._by_symbol.setdefault(snapshot.symbol, {})[snapshot.exchange] = snapshot
+        self._update_top(snapshot)
+    
+    def _update_top(self, snapshot: OrderbookSnapshot):
+        """Refresh the top-of-book arrays for the snapshot's symbol."""
+        symbol = snapshot.symbol
+        index = self._top_index.get(symbol)
+        if index is None:
+            index = self._top_index[symbol] = {}
+            self._top_exchanges[symbol] = []
+            self._top_bids[symbol] = np.empty(0, dtype=np.float64)
+            self._top_asks[symbol] = np.empty(0, dtype=np.float64)
+        
+        i = index.get(snapshot.exchange)
+        if i is None:
+            # New exchange for this symbol: grow arrays (rare)
+            i = index[snapshot.exchange] = len(self._top_exchanges[symbol])
+            self._top_exchanges[symbol].append(snapshot.exchange)
+            self._top_bids[symbol] = np.append(self._top_bids[symbol], np.nan)
+            self._top_asks[symbol] = np.append(self._top_asks[symbol], np.nan)
+        
+        # A book is only usable when both sides are present
+        if snapshot.mid_price is not None:
+            self._top_bids[symbol][i] = snapshot.best_bid_px
+            self._top_asks[symbol][i] = snapshot.best_ask_px
+        else:
+            self._top_bids[symbol][i] = np.nan
+            self._top_asks[symbol][i] = np.nan
     
     def get(self, exchange: str, symbol: str) -> Optional[OrderbookSnapshot]:
         """Get current orderbook for an exchange/symbol pair."""
-        return self._books.get(exchange, {}).get(symbol)
+        return self._books.get((exchange, symbol))
     
     def get_all_for_symbol(self, symbol: str) -> Dict[str, OrderbookSnapshot]:
-        """Get orderbooks from all exchanges for a symbol."""
-        result = {}
-        for exchange, books in self._books.items():
-            if symbol in books:
-                result[exchange] = books[symbol]
-        return result
+        """
+        Get orderbooks from all exchanges for a symbol.
+        
+        Returns the store's live per-symbol dict (updated in place);
+        treat it as read-only.
+        """
+        return self._by_symbol.get(symbol, {})
+    
+    def get_exchange_index(self, symbol: str, exchange: str) -> Optional[int]:
+        """Get an exchange's index into the symbol's top-of-book arrays."""
+        return self._top_index.get(symbol, {}).get(exchange)
+    
+    def get_top_of_book(self, symbol: str) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Get top-of-book prices for a symbol across exchanges.
+        
+        Returns:
+            Tuple of (exchanges, best_bids, best_asks) where the arrays are
+            indexed like `exchanges`. The arrays are live; do not mutate.
+        """
+        if symbol not in self._top_index:
+            empty = np.empty(0, dtype=np.float64)
+            return [], empty, empty
+        return self._top_exchanges[symbol], self._top_bids[symbol], self._top_asks[symbol]
     
     def clear(self):
         """Clear all stored orderbooks."""
         self._books.clear()
+        self._by_symbol.clear()
+        self._top_exchanges.clear()
+        self._top_index.clear()
+        self._top_bids.clear()
+        self._top_asks.clear()
@@ -5,29 +5,179 @@ Produces detailed reports in various formats (JSON, HTML, CSV).
 """
 
 from dataclasses import dataclass, asdict
-from datetime import datetime
+from datetime import datetime, timezone, tzinfo
 from decimal import Decimal
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 from pathlib import Path
-import json
+import asyncio
 import csv
+import io
 
+import numpy as np
+import orjson
+import polars as pl
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 from structlog import get_logger
 
 from .backtest import BacktestResult, SpreadTrade
+from .orderbook import timestamp_to_ns, ns_to_timestamp
 
 logger = get_logger(__name__)
 
+# HTML report template, compiled once at import
+_TEMPLATE_ENV = Environment(
+    loader=FileSystemLoader(Path(__file__).parent / "templates"),
+    autoescape=select_autoescape(["html", "html.j2"]),
+    auto_reload=False,
+    keep_trailing_newline=True
+)
+_HTML_TEMPLATE = _TEMPLATE_ENV.get_template("report.html.j2")
 
-class DecimalEncoder(json.JSONEncoder):
-    """JSON encoder that handles Decimal types."""
+# Trade export columns, in the order produced by BacktestReport.trade_rows()
+TRADE_FIELDS = (
+    "trade_id",
+    "symbol",
+    "long_exchange",
+    "short_exchange",
+    "entry_time",
+    "exit_time",
+    "size_in_coins",
+    "long_entry_price",
+    "short_entry_price",
+    "long_exit_price",
+    "short_exit_price",
+    "entry_spread_bps",
+    "exit_spread_bps",
+    "gross_pnl",
+    "fees",
+    "net_pnl",
+    "pnl_bps",
+    "duration_seconds",
+    "is_open",
+)
+
+
+def _json_default(obj):
+    """orjson fallback for Decimal values."""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError
+
+
+@dataclass(slots=True)
+class PackedTrades:
+    """
+    Trades stored column-wise for long-lived report caches.
+    
+    Numeric fields are float64 arrays and times are int64 epoch
+    nanoseconds, instead of one SpreadTrade object (with boxed floats and
+    datetimes) per trade. Values are stored exactly, so rows() yields the
+    same tuples as BacktestReport.trades_iter() over the original trades.
+    Optional prices, spreads and durations are stored as 0.0 when unset,
+    which the rows already report as None.
+    """
+    trade_id: List[str]
+    symbol: List[str]
+    long_exchange: List[str]
+    short_exchange: List[str]
+    entry_ns: np.ndarray
+    exit_ns: np.ndarray
+    has_exit: np.ndarray
+    tz: Optional[tzinfo]
+    values: np.ndarray  # (n, 12) float64, columns as in _PACKED_COLUMNS
+    is_open: np.ndarray
+    
+    @classmethod
+    def from_trades(cls, trades: List[SpreadTrade]) -> "PackedTrades":
+        """Pack a list of trades."""
+        values = np.array([
+            (
+                t.size_in_coins,
+                t.long_entry_price or 0.0,
+                t.short_entry_price or 0.0,
+                t.long_exit_price or 0.0,
+                t.short_exit_price or 0.0,
+                t.entry_spread_bps or 0.0,
+                t.exit_spread_bps or 0.0,
+                t.gross_pnl,
+                t.fees,
+                t.net_pnl,
+                t.pnl_bps,
+                t.duration.total_seconds() if t.exit_time else 0.0,
+            )
+            for t in trades
+        ], dtype=np.float64).reshape(-1, len(_PACKED_COLUMNS))
+        
+        return cls(
+            trade_id=[t.trade_id for t in trades],
+            symbol=[t.canonical_symbol for t in trades],
+            long_exchange=[t.long_exchange for t in trades],
+            short_exchange=[t.short_exchange for t in trades],
+            entry_ns=np.array([timestamp_to_ns(t.entry_time) for t in trades], dtype=np.int64),
+            exit_ns=np.array(
+                [timestamp_to_ns(t.exit_time) if t.exit_time else 0 for t in trades], dtype=np.int64
+            ),
+            has_exit=np.array([t.exit_time is not None for t in trades], dtype=bool),
+            tz=trades[0].entry_time.tzinfo if trades else None,
+            values=values,
+            is_open=np.array([t.is_open for t in trades], dtype=bool),
+        )
+    
+    def __len__(self) -> int:
+        return len(self.trade_id)
+    
+    def _isoformat(self, ts_ns: int) -> str:
+        ts = ns_to_timestamp(ts_ns)
+        if self.tz is not None:
+            ts = ts.replace(tzinfo=timezone.utc).astimezone(self.tz)
+        return ts.isoformat()
     
-    def default(self, obj):
-        if isinstance(obj, Decimal):
-            return str(obj)
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
+    def rows(self) -> Iterator[tuple]:
+        """Yield trade rows in TRADE_FIELDS order."""
+        for i, (
+            size_in_coins, long_entry_price, short_entry_price, long_exit_price,
+            short_exit_price, entry_spread_bps, exit_spread_bps, gross_pnl, fees,
+            net_pnl, pnl_bps, duration_seconds,
+        ) in enumerate(self.values.tolist()):
+            has_exit = bool(self.has_exit[i])
+            yield (
+                self.trade_id[i],
+                self.symbol[i],
+                self.long_exchange[i],
+                self.short_exchange[i],
+                self._isoformat(int(self.entry_ns[i])),
+                self._isoformat(int(self.exit_ns[i])) if has_exit else None,
+                size_in_coins,
+                long_entry_price or None,
+                short_entry_price or None,
+                long_exit_price or None,
+                short_exit_price or None,
+                entry_spread_bps or None,
+                exit_spread_bps or None,
+                gross_pnl,
+                fees,
+                net_pnl,
+                pnl_bps,
+                duration_seconds or None,
+                bool(self.is_open[i]),
+            )
+
+
+# Float columns of PackedTrades.values
+_PACKED_COLUMNS = (
+    "size_in_coins",
+    "long_entry_price",
+    "short_entry_price",
+    "long_exit_price",
+    "short_exit_price",
+    "entry_spread_bps",
+    "exit_spread_bps",
+    "gross_pnl",
+    "fees",
+    "net_pnl",
+    "pnl_bps",
+    "duration_seconds",
+)
 
 
 @dataclass
@@ -40,11 +190,25 @@ class BacktestReport:
         generated_at: Report generation timestamp
         title: Report title
         notes: Additional notes
+        packed_trades: Columnar copy of the trades once pack_trades() has
+            run; result.trades is then emptied
     """
     result: BacktestResult
     generated_at: datetime
     title: str = "CrossSpread Backtest Report"
     notes: str = ""
+    packed_trades: Optional[PackedTrades] = None
+    
+    def pack_trades(self):
+        """
+        Move the trades into a PackedTrades for caching.
+        
+        Trade exports are unchanged; result.trades is emptied so the
+        per-trade objects can be freed.
+        """
+        if self.packed_trades is None:
+            self.packed_trades = PackedTrades.from_trades(self.result.trades)
+            self.result.trades = []
     
     def to_summary_dict(self) -> Dict[str, Any]:
         """Get summary as dictionary."""
@@ -91,30 +255,74 @@ class BacktestReport:
             },
         }
     
+    def trade_rows(self) -> List[tuple]:
+        """
+        Get trades as tuples of raw values in TRADE_FIELDS order.
+        
+        Numeric fields stay floats (None when unset), so writers can
+        format them without intermediate strings.
+        """
+        return list(self.trades_iter())
+    
+    def trades_iter(self) -> Iterator[tuple]:
+        """Lazily yield the rows of trade_rows(), one trade at a time."""
+        if self.packed_trades is not None:
+            yield from self.packed_trades.rows()
+            return
+        
+        for t in self.result.trades:
+            duration = t.duration
+            yield (
+                t.trade_id,
+                t.canonical_symbol,
+                t.long_exchange,
+                t.short_exchange,
+                t.entry_time.isoformat(),
+                t.exit_time.isoformat() if t.exit_time else None,
+                t.size_in_coins,
+                t.long_entry_price or None,
+                t.short_entry_price or None,
+                t.long_exit_price or None,
+                t.short_exit_price or None,
+                t.entry_spread_bps or None,
+                t.exit_spread_bps or None,
+                t.gross_pnl,
+                t.fees,
+                t.net_pnl,
+                t.pnl_bps,
+                duration.total_seconds() if duration else None,
+                t.is_open,
+            )
+    
     def to_trades_list(self) -> List[Dict[str, Any]]:
         """Get trades as list of dictionaries."""
         trades = []
-        for t in self.result.trades:
+        for (
+            trade_id, symbol, long_exchange, short_exchange, entry_time, exit_time,
+            size_in_coins, long_entry_price, short_entry_price, long_exit_price,
+            short_exit_price, entry_spread_bps, exit_spread_bps, gross_pnl, fees,
+            net_pnl, pnl_bps, duration_seconds, is_open,
+        ) in self.trade_rows():
             trades.append({
-                "trade_id": t.trade_id,
-                "symbol": t.canonical_symbol,
-                "long_exchange": t.long_exchange,
-                "short_exchange": t.short_exchange,
-                "entry_time": t.entry_time.isoformat(),
-                "exit_time": t.exit_time.isoformat() if t.exit_time else None,
-                "size_in_coins": str(t.size_in_coins),
-                "long_entry_price": str(t.long_entry_price) if t.long_entry_price else None,
-                "short_entry_price": str(t.short_entry_price) if t.short_entry_price else None,
-                "long_exit_price": str(t.long_exit_price) if t.long_exit_price else None,
-                "short_exit_price": str(t.short_exit_price) if t.short_exit_price else None,
-                "entry_spread_bps": str(t.entry_spread_bps) if t.entry_spread_bps else None,
-                "exit_spread_bps": str(t.exit_spread_bps) if t.exit_spread_bps else None,
-                "gross_pnl": str(t.gross_pnl),
-                "fees": str(t.fees),
-                "net_pnl": str(t.net_pnl),
-                "pnl_bps": str(t.pnl_bps),
-                "duration_seconds": t.duration.total_seconds() if t.duration else None,
-                "is_open": t.is_open,
+                "trade_id": trade_id,
+                "symbol": symbol,
+                "long_exchange": long_exchange,
+                "short_exchange": short_exchange,
+                "entry_time": entry_time,
+                "exit_time": exit_time,
+                "size_in_coins": str(size_in_coins),
+                "long_entry_price": str(long_entry_price) if long_entry_price else None,
+                "short_entry_price": str(short_entry_price) if short_entry_price else None,
+                "long_exit_price": str(long_exit_price) if long_exit_price else None,
+                "short_exit_price": str(short_exit_price) if short_exit_price else None,
+                "entry_spread_bps": str(entry_spread_bps) if entry_spread_bps else None,
+                "exit_spread_bps": str(exit_spread_bps) if exit_spread_bps else None,
+                "gross_pnl": str(gross_pnl),
+                "fees": str(fees),
+                "net_pnl": str(net_pnl),
+                "pnl_bps": str(pnl_bps),
+                "duration_seconds": duration_seconds,
+                "is_open": is_open,
             })
         return trades
 
@@ -169,21 +377,8 @@ class ReportGenerator:
         Returns:
             Path to saved file
         """
-        if not filename:
-            timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
-            filename = f"backtest_report_{timestamp}.json"
-        
-        filepath = self.output_dir / filename
-        
-        data = {
-            "summary": report.to_summary_dict(),
-            "trades": report.to_trades_list(),
-        }
-        
-        with open(filepath, "w") as f:
-            json.dump(data, f, cls=DecimalEncoder, indent=2)
-        
-        logger.info("report_saved_json", path=str(filepath))
+        filepath = self._path(report, filename, "backtest_report", "json")
+        self._write_json(filepath, report.to_summary_dict(), report.to_trades_list())
         return filepath
     
     def save_csv(self, report: BacktestReport, filename: Optional[str] = None) -> Path:
@@ -197,24 +392,40 @@ class ReportGenerator:
         Returns:
             Path to saved file
         """
-        if not filename:
-            timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
-            filename = f"backtest_trades_{timestamp}.csv"
+        filepath = self._path(report, filename, "backtest_trades", "csv")
+        self._write_csv(filepath, report.trade_rows())
+        return filepath
+    
+    @staticmethod
+    def iter_csv(report: BacktestReport, chunk_rows: int = 1000) -> Iterator[str]:
+        """
+        Generate the trades CSV lazily, for streaming responses.
         
-        filepath = self.output_dir / filename
-        trades = report.to_trades_list()
+        Produces the same columns as save_csv, starting with the header,
+        in chunks of up to chunk_rows rows.
         
-        if not trades:
-            logger.warning("no_trades_to_export")
-            return filepath
+        Args:
+            report: The report to export
+            chunk_rows: Rows per yielded chunk
+            
+        Yields:
+            CSV text chunks
+        """
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(TRADE_FIELDS)
         
-        with open(filepath, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=trades[0].keys())
-            writer.writeheader()
-            writer.writerows(trades)
+        pending = 0
+        for row in report.trades_iter():
+            writer.writerow(row)
+            pending += 1
+            if pending == chunk_rows:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+                pending = 0
         
-        logger.info("report_saved_csv", path=str(filepath))
-        return filepath
+        yield buffer.getvalue()
     
     def save_html(self, report: BacktestReport, filename: Optional[str] = None) -> Path:
         """
@@ -227,22 +438,95 @@ class ReportGenerator:
         Returns:
             Path to saved file
         """
-        if not filename:
-            timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
-            filename = f"backtest_report_{timestamp}.html"
+        filepath = self._path(report, filename, "backtest_report", "html")
+        self._write_html(filepath, report.to_summary_dict(), report.to_trades_list(), report)
+        return filepath
+    
+    async def save_all(self, report: BacktestReport, basename: Optional[str] = None) -> Dict[str, Path]:
+        """
+        Save the report as JSON, CSV and HTML concurrently.
         
-        filepath = self.output_dir / filename
+        The summary and trade data are built once and shared by all three
+        writers, which run in worker threads.
         
+        Args:
+            report: The report to save
+            basename: Optional filename without extension
+            
+        Returns:
+            Dict mapping format to saved file path
+        """
         summary = report.to_summary_dict()
+        rows = report.trade_rows()
         trades = report.to_trades_list()
         
+        paths = {
+            "json": self._path(report, basename and f"{basename}.json", "backtest_report", "json"),
+            "csv": self._path(report, basename and f"{basename}.csv", "backtest_trades", "csv"),
+            "html": self._path(report, basename and f"{basename}.html", "backtest_report", "html"),
+        }
+        
+        await asyncio.gather(
+            asyncio.to_thread(self._write_json, paths["json"], summary, trades),
+            asyncio.to_thread(self._write_csv, paths["csv"], rows),
+            asyncio.to_thread(self._write_html, paths["html"], summary, trades, report),
+        )
+        
+        return paths
+    
+    def _path(self, report: BacktestReport, filename: Optional[str], prefix: str, ext: str) -> Path:
+        """Resolve an output path, auto-naming from the report timestamp."""
+        if not filename:
+            timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
+            filename = f"{prefix}_{timestamp}.{ext}"
+        return self.output_dir / filename
+    
+    def _write_json(self, filepath: Path, summary: Dict[str, Any], trades: List[Dict[str, Any]]):
+        """Write summary and trades as indented JSON."""
+        data = {
+            "summary": summary,
+            "trades": trades,
+        }
+        
+        with open(filepath, "wb") as f:
+            f.write(orjson.dumps(data, default=_json_default, option=orjson.OPT_INDENT_2))
+        
+        logger.info("report_saved_json", path=str(filepath))
+    
+    def _write_csv(self, filepath: Path, rows: List[tuple]):
+        """Write trade rows as CSV (no file if there are no trades)."""
+        if not rows:
+            logger.warning("no_trades_to_export")
+            return
+        
+        # Cells are formatted with str() as the csv module does (polars'
+        # float formatting differs, e.g. 1e-05 vs 0.00001), so the file
+        # matches what iter_csv streams
+        frame = pl.DataFrame(
+            {
+                name: [None if value is None else str(value) for value in column]
+                for name, column in zip(TRADE_FIELDS, zip(*rows))
+            },
+            schema={name: pl.String for name in TRADE_FIELDS},
+        )
+        frame.write_csv(filepath, line_terminator="\r\n")
+        
+        logger.info("report_saved_csv", path=str(filepath))
+    
+    def _write_html(
+        self,
+        filepath: Path,
+        summary: Dict[str, Any],
+        trades: List[Dict[str, Any]],
+        report: BacktestReport
+    ):
+        """Render and write the HTML report."""
         html = self._generate_html(summary, trades, report)
         
         with open(filepath, "w") as f:
             f.write(html)
         
         logger.info("report_saved_html", path=str(filepath))
-        return filepath
     
     def _generate_html(
         self,
@@ -256,213 +540,11 @@ class ReportGenerator:
         net_pnl = Decimal(summary["pnl"]["net_pnl"])
         pnl_color = "green" if net_pnl >= 0 else "red"
         
-        trades_html = ""
-        for t in trades[:100]:  # Limit to 100 trades in HTML
-            pnl = Decimal(t["net_pnl"])
-            row_class = "win" if pnl >= 0 else "loss"
-            trades_html += f"""
-            <tr class="{row_class}">
-                <td>{t["entry_time"][:19]}</td>
-                <td>{t["symbol"]}</td>
-                <td>{t["long_exchange"]} → {t["short_exchange"]}</td>
-                <td>{t["size_in_coins"]}</td>
-                <td>{t["entry_spread_bps"] or '-'}</td>
-                <td>{t["exit_spread_bps"] or '-'}</td>
-                <td style="color: {"green" if pnl >= 0 else "red"}">{t["net_pnl"]}</td>
-            </tr>
-            """
-        
-        return f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>{report.title}</title>
-    <style>
-        body {{
-            font-family: 'Segoe UI', Arial, sans-serif;
-            margin: 40px;
-            background: #1a1a2e;
-            color: #eee;
-        }}
-        h1, h2, h3 {{
-            color: #00d4ff;
-        }}
-        .container {{
-            max-width: 1200px;
-            margin: 0 auto;
-        }}
-        .grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }}
-        .card {{
-            background: #16213e;
-            border-radius: 10px;
-            padding: 20px;
-            box-shadow: 0 4px 6px rgba(0,0,0,0.3);
-        }}
-        .card h3 {{
-            margin-top: 0;
-            border-bottom: 2px solid #00d4ff;
-            padding-bottom: 10px;
-        }}
-        .metric {{
-            display: flex;
-            justify-content: space-between;
-            padding: 8px 0;
-            border-bottom: 1px solid #333;
-        }}
-        .metric-label {{
-            color: #888;
-        }}
-        .metric-value {{
-            font-weight: bold;
-        }}
-        .pnl-positive {{
-            color: #00ff88;
-        }}
-        .pnl-negative {{
-            color: #ff4444;
-        }}
-        table {{
-            width: 100%;
-            border-collapse: collapse;
-            margin-top: 20px;
-        }}
-        th, td {{
-            padding: 12px;
-            text-align: left;
-            border-bottom: 1px solid #333;
-        }}
-        th {{
-            background: #0f3460;
-            color: #00d4ff;
-        }}
-        tr:hover {{
-            background: #1f4068;
-        }}
-        tr.win td:last-child {{
-            color: #00ff88;
-        }}
-        tr.loss td:last-child {{
-            color: #ff4444;
-        }}
-        .footer {{
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #333;
-            color: #666;
-            text-align: center;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>📊 {report.title}</h1>
-        <p>Generated: {summary["report"]["generated_at"]}</p>
-        
-        <div class="grid">
-            <div class="card">
-                <h3>📈 Performance</h3>
-                <div class="metric">
-                    <span class="metric-label">Total Trades</span>
-                    <span class="metric-value">{summary["performance"]["total_trades"]}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Win Rate</span>
-                    <span class="metric-value">{summary["performance"]["win_rate_pct"]}%</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Profit Factor</span>
-                    <span class="metric-value">{summary["performance"]["profit_factor"] or "N/A"}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Avg Trade P&L</span>
-                    <span class="metric-value">{summary["performance"]["avg_trade_pnl"]}</span>
-                </div>
-            </div>
-            
-            <div class="card">
-                <h3>💰 P&L</h3>
-                <div class="metric">
-                    <span class="metric-label">Gross P&L</span>
-                    <span class="metric-value">{summary["pnl"]["gross_pnl"]}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Total Fees</span>
-                    <span class="metric-value">{summary["pnl"]["total_fees"]}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Net P&L</span>
-                    <span class="metric-value {pnl_color}">{summary["pnl"]["net_pnl"]}</span>
-                </div>
-            </div>
-            
-            <div class="card">
-                <h3>⚠️ Risk Metrics</h3>
-                <div class="metric">
-                    <span class="metric-label">Max Drawdown</span>
-                    <span class="metric-value">{summary["risk"]["max_drawdown"]}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Max DD %</span>
-                    <span class="metric-value">{summary["risk"]["max_drawdown_pct"]}%</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Sharpe Ratio</span>
-                    <span class="metric-value">{summary["risk"]["sharpe_ratio"] or "N/A"}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Sortino Ratio</span>
-                    <span class="metric-value">{summary["risk"]["sortino_ratio"] or "N/A"}</span>
-                </div>
-            </div>
-            
-            <div class="card">
-                <h3>⚡ Execution</h3>
-                <div class="metric">
-                    <span class="metric-label">Snapshots</span>
-                    <span class="metric-value">{summary["execution"]["snapshots_processed"]:,}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Avg Spread (bps)</span>
-                    <span class="metric-value">{summary["execution"]["avg_spread_bps"]}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Avg Slippage (bps)</span>
-                    <span class="metric-value">{summary["execution"]["avg_slippage_bps"]}</span>
-                </div>
-                <div class="metric">
-                    <span class="metric-label">Run Time</span>
-                    <span class="metric-value">{summary["execution"]["run_duration_seconds"]:.1f}s</span>
-                </div>
-            </div>
-        </div>
-        
-        <h2>📋 Trade History</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Entry Time</th>
-                    <th>Symbol</th>
-                    <th>Direction</th>
-                    <th>Size</th>
-                    <th>Entry Spread</th>
-                    <th>Exit Spread</th>
-                    <th>Net P&L</th>
-                </tr>
-            </thead>
-            <tbody>
-                {trades_html}
-            </tbody>
-        </table>
-        
-        <div class="footer">
-            <p>CrossSpread Backtest Engine v1.0 | {len(trades)} total trades</p>
-        </div>
-    </div>
-</body>
-</html>
-        """
+        return _HTML_TEMPLATE.render(
+            title=report.title,
+            summary=summary,
+            pnl_color=pnl_color,
+            # Limit to 100 trades in HTML, paired with a win flag
+            trades=[(t, Decimal(t["net_pnl"]) >= 0) for t in trades[:100]],
+            total_trades=len(trades)
+        )
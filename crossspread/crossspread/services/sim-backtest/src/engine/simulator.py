@@ -7,56 +7,102 @@ Provides realistic order simulation including:
 - Order slicing simulation
 """
 
+from bisect import bisect_left, bisect_right, insort
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
 from typing import Optional, List, Dict, Callable
-from enum import Enum
+from enum import IntEnum
 from uuid import uuid4
 import asyncio
+import time
 
 from structlog import get_logger
 
-from .orderbook import OrderbookSnapshot, OrderbookLevel
+from .orderbook import (
+    OrderbookSnapshot, PRICE_SCALE, QTY_SCALE, to_ticks, timestamp_to_ns, ns_to_timestamp
+)
 from .slippage import SlippageCalculator, TradeSide, FeeStructure, EXCHANGE_FEES
 
 logger = get_logger(__name__)
 
+# Decimal constants, hoisted to avoid re-parsing literals in hot paths
+_HUNDRED = Decimal("100")
+_BPS = Decimal("10000")
 
-class OrderSide(Enum):
-    BUY = "buy"
-    SELL = "sell"
 
+def _decimal_to_ticks(value: Decimal, scale: int) -> int:
+    """Convert a Decimal price or quantity to fixed-point ticks."""
+    return int(value * scale)
 
-class OrderType(Enum):
-    LIMIT = "limit"
-    MARKET = "market"
 
+# Integer codes keep the comparisons in the fill path to plain int compares
+class OrderSide(IntEnum):
+    BUY = 0
+    SELL = 1
 
-class OrderStatus(Enum):
-    PENDING = "pending"
-    OPEN = "open"
-    PARTIALLY_FILLED = "partially_filled"
-    FILLED = "filled"
-    CANCELLED = "cancelled"
-    REJECTED = "rejected"
 
+class OrderType(IntEnum):
+    LIMIT = 0
+    MARKET = 1
 
-@dataclass
+
+class OrderStatus(IntEnum):
+    PENDING = 0
+    OPEN = 1
+    PARTIALLY_FILLED = 2
+    FILLED = 3
+    CANCELLED = 4
+    REJECTED = 5
+
+
+@dataclass(slots=True)
 class SimulatedFill:
-    """A single fill of an order."""
+    """
+    A single fill of an order.
+    
+    Price, quantity and fee are fixed-point ticks (PRICE_SCALE/QTY_SCALE,
+    fee in price ticks) so fill arithmetic stays in native ints; the
+    price/quantity/fee properties give Decimal values at the boundary.
+    The fill time is kept as epoch nanoseconds.
+    """
     fill_id: str
     order_id: str
-    timestamp: datetime
-    price: Decimal
-    quantity: Decimal
-    fee: Decimal
+    timestamp_ns: int
+    price_ticks: int
+    qty_ticks: int
+    fee_ticks: int
     is_maker: bool
     
+    @property
+    def timestamp(self) -> datetime:
+        """Fill time (naive UTC)."""
+        return ns_to_timestamp(self.timestamp_ns)
+    
+    @property
+    def price(self) -> Decimal:
+        """Fill price."""
+        return Decimal(self.price_ticks) / PRICE_SCALE
+    
+    @property
+    def quantity(self) -> Decimal:
+        """Fill quantity."""
+        return Decimal(self.qty_ticks) / QTY_SCALE
+    
+    @property
+    def fee(self) -> Decimal:
+        """Fee paid on the fill."""
+        return Decimal(self.fee_ticks) / PRICE_SCALE
+    
+    @property
+    def value_ticks(self) -> int:
+        """Total fill value in price ticks."""
+        return self.price_ticks * self.qty_ticks // QTY_SCALE
+    
     @property
     def value(self) -> Decimal:
         """Total fill value."""
-        return self.price * self.quantity
+        return Decimal(self.price_ticks * self.qty_ticks) / (PRICE_SCALE * QTY_SCALE)
     
     @property
     def total_cost(self) -> Decimal:
@@ -64,53 +110,145 @@ class SimulatedFill:
         return self.value + self.fee
 
 
-@dataclass
+@dataclass(slots=True)
 class SimulatedOrder:
-    """A simulated order."""
+    """
+    A simulated order.
+    
+    Price and quantities are fixed-point ticks and times are epoch
+    nanoseconds; the Decimal and datetime properties (price, quantity,
+    created_at, ...) convert at the boundary.
+    fills is append-only through add_fill, which keeps the running fill
+    totals in step.
+    """
     order_id: str
     exchange: str
     symbol: str
     side: OrderSide
     order_type: OrderType
-    price: Optional[Decimal]  # None for market orders
-    quantity: Decimal
-    filled_quantity: Decimal = Decimal("0")
+    price_ticks: Optional[int]  # None for market orders
+    qty_ticks: int
+    filled_ticks: int = 0
     status: OrderStatus = OrderStatus.PENDING
-    created_at: datetime = field(default_factory=datetime.utcnow)
-    updated_at: datetime = field(default_factory=datetime.utcnow)
+    created_at_ns: int = field(default_factory=time.time_ns)
+    updated_at_ns: int = field(default_factory=time.time_ns)
     fills: List[SimulatedFill] = field(default_factory=list)
     
+    # Running fill totals: sum of price_ticks * qty_ticks, and fee ticks
+    _fill_notional: int = field(default=0, init=False, repr=False)
+    _fee_ticks: int = field(default=0, init=False, repr=False)
+    
+    @property
+    def created_at(self) -> datetime:
+        """Creation time (naive UTC)."""
+        return ns_to_timestamp(self.created_at_ns)
+    
+    @property
+    def updated_at(self) -> datetime:
+        """Last update time (naive UTC)."""
+        return ns_to_timestamp(self.updated_at_ns)
+    
+    @property
+    def price(self) -> Optional[Decimal]:
+        """Limit price (None for market orders)."""
+        return None if self.price_ticks is None else Decimal(self.price_ticks) / PRICE_SCALE
+    
+    @property
+    def quantity(self) -> Decimal:
+        """Order quantity."""
+        return Decimal(self.qty_ticks) / QTY_SCALE
+    
+    @property
+    def filled_quantity(self) -> Decimal:
+        """Filled quantity."""
+        return Decimal(self.filled_ticks) / QTY_SCALE
+    
+    @property
+    def remaining_ticks(self) -> int:
+        """Unfilled quantity in ticks."""
+        return self.qty_ticks - self.filled_ticks
+    
     @property
     def remaining_quantity(self) -> Decimal:
         """Unfilled quantity."""
-        return self.quantity - self.filled_quantity
+        return Decimal(self.remaining_ticks) / QTY_SCALE
     
     @property
     def average_fill_price(self) -> Optional[Decimal]:
         """Volume-weighted average fill price."""
-        if not self.fills:
+        if self.filled_ticks <= 0:
             return None
-        total_value = sum(f.value for f in self.fills)
-        total_qty = sum(f.quantity for f in self.fills)
-        return total_value / total_qty if total_qty > 0 else None
+        return Decimal(self._fill_notional) / self.filled_ticks / PRICE_SCALE
     
     @property
     def total_fees(self) -> Decimal:
         """Total fees paid."""
-        return sum(f.fee for f in self.fills)
+        return Decimal(self._fee_ticks) / PRICE_SCALE
     
     def add_fill(self, fill: SimulatedFill):
         """Add a fill to the order."""
         self.fills.append(fill)
-        self.filled_quantity += fill.quantity
-        self.updated_at = fill.timestamp
+        self.filled_ticks += fill.qty_ticks
+        self._fill_notional += fill.price_ticks * fill.qty_ticks
+        self._fee_ticks += fill.fee_ticks
+        self.updated_at_ns = fill.timestamp_ns
         
-        if self.filled_quantity >= self.quantity:
+        if self.filled_ticks >= self.qty_ticks:
             self.status = OrderStatus.FILLED
-        elif self.filled_quantity > 0:
+        elif self.filled_ticks > 0:
             self.status = OrderStatus.PARTIALLY_FILLED
 
 
+class RestingOrders:
+    """
+    Resting limit orders for one side of one symbol, bucketed by price ticks.
+    
+    Keeps the distinct prices sorted so a book update can pick out just
+    the orders whose limit crosses the new top of book.
+    """
+    
+    def __init__(self):
+        self._prices: List[int] = []  # Sorted ascending
+        self._orders: Dict[int, Dict[str, SimulatedOrder]] = {}
+    
+    def __len__(self) -> int:
+        return len(self._prices)
+    
+    def add(self, order: SimulatedOrder):
+        """Add a limit order at its price."""
+        bucket = self._orders.get(order.price_ticks)
+        if bucket is None:
+            insort(self._prices, order.price_ticks)
+            bucket = self._orders[order.price_ticks] = {}
+        bucket[order.order_id] = order
+    
+    def remove(self, order: SimulatedOrder):
+        """Remove a limit order."""
+        bucket = self._orders[order.price_ticks]
+        del bucket[order.order_id]
+        if not bucket:
+            del self._orders[order.price_ticks]
+            del self._prices[bisect_left(self._prices, order.price_ticks)]
+    
+    def at_or_above(self, price_ticks: int) -> List[SimulatedOrder]:
+        """Orders priced at or above price_ticks, highest price first."""
+        start = bisect_left(self._prices, price_ticks)
+        return [
+            order
+            for price in reversed(self._prices[start:])
+            for order in self._orders[price].values()
+        ]
+    
+    def at_or_below(self, price_ticks: int) -> List[SimulatedOrder]:
+        """Orders priced at or below price_ticks, lowest price first."""
+        end = bisect_right(self._prices, price_ticks)
+        return [
+            order
+            for price in self._prices[:end]
+            for order in self._orders[price].values()
+        ]
+
+
 class SimulatedExchange:
     """
     Simulates an exchange for backtesting.
@@ -123,6 +261,7 @@ class SimulatedExchange:
         exchange_name: str,
         fee_structure: Optional[FeeStructure] = None,
         latency_ms: int = 10,  # Simulated order latency
+        use_uuid: bool = False,
     ):
         """
         Initialize simulated exchange.
@@ -131,15 +270,26 @@ class SimulatedExchange:
             exchange_name: Exchange identifier
             fee_structure: Fee structure for the exchange
             latency_ms: Simulated order placement latency
+            use_uuid: Use random UUIDs for order/fill ids instead of
+                sequential ids (production-like ids, slower)
         """
         self.exchange_name = exchange_name
         self.fee_structure = fee_structure or EXCHANGE_FEES.get(
             exchange_name.lower(), FeeStructure()
         )
         self.latency_ms = latency_ms
+        self.use_uuid = use_uuid
+        self._order_seq = 0
+        self._fill_seq = 0
         
         self._orders: Dict[str, SimulatedOrder] = {}
         self._open_orders: Dict[str, SimulatedOrder] = {}
+        # Open orders indexed by symbol, so book updates only visit their own symbol
+        self._open_by_symbol: Dict[str, Dict[str, SimulatedOrder]] = {}
+        # Open limit orders by symbol and price; market orders match every update
+        self._resting_bids: Dict[str, RestingOrders] = {}
+        self._resting_asks: Dict[str, RestingOrders] = {}
+        self._resting_market: Dict[str, Dict[str, SimulatedOrder]] = {}
         self._current_book: Optional[OrderbookSnapshot] = None
         
         # Event callbacks
@@ -166,16 +316,33 @@ class SimulatedExchange:
         
         self._current_book = book
         
-        # Try to fill open orders
-        for order_id, order in list(self._open_orders.items()):
-            if order.symbol != book.symbol:
-                continue
-            
+        symbol = book.symbol
+        if symbol not in self._open_by_symbol:
+            return
+        
+        # Only orders that can trade against this book: market orders, and
+        # limit orders whose price crosses the opposite best
+        candidates = list(self._resting_market.get(symbol, {}).values())
+        
+        bids = self._resting_bids.get(symbol)
+        if bids and book.best_ask_px is not None:
+            candidates.extend(bids.at_or_above(round(book.best_ask_px * PRICE_SCALE)))
+        
+        asks = self._resting_asks.get(symbol)
+        if asks and book.best_bid_px is not None:
+            candidates.extend(asks.at_or_below(round(book.best_bid_px * PRICE_SCALE)))
+        
+        # Try to fill open orders; completed ones are dropped after the pass
+        # so the indexes are not mutated mid-iteration. Cancelled orders
+        # already left the indexes in cancel_order.
+        to_delete: List[SimulatedOrder] = []
+        for order in candidates:
             self._try_fill_order(order, book)
-            
-            # Remove from open orders if complete
-            if order.status in (OrderStatus.FILLED, OrderStatus.CANCELLED):
-                del self._open_orders[order_id]
+            if order.status == OrderStatus.FILLED:
+                to_delete.append(order)
+        
+        for order in to_delete:
+            self._remove_open_order(order)
     
     def place_order(
         self,
@@ -203,26 +370,37 @@ class SimulatedExchange:
         if order_type == OrderType.LIMIT and price is None:
             raise ValueError("Limit orders require a price")
         
+        created_at_ns = timestamp_to_ns(timestamp) if timestamp else time.time_ns()
+        
         order = SimulatedOrder(
-            order_id=str(uuid4()),
+            order_id=self._next_order_id(),
             exchange=self.exchange_name,
             symbol=symbol,
             side=side,
             order_type=order_type,
-            price=price,
-            quantity=quantity,
+            price_ticks=None if price is None else _decimal_to_ticks(price, PRICE_SCALE),
+            qty_ticks=_decimal_to_ticks(quantity, QTY_SCALE),
             status=OrderStatus.OPEN,
-            created_at=timestamp or datetime.utcnow(),
+            created_at_ns=created_at_ns,
+            updated_at_ns=created_at_ns,
         )
         
         self._orders[order.order_id] = order
         self._open_orders[order.order_id] = order
+        self._open_by_symbol.setdefault(symbol, {})[order.order_id] = order
+        if order_type == OrderType.MARKET:
+            self._resting_market.setdefault(symbol, {})[order.order_id] = order
+        else:
+            resting = self._resting_bids if side == OrderSide.BUY else self._resting_asks
+            if symbol not in resting:
+                resting[symbol] = RestingOrders()
+            resting[symbol].add(order)
         
         logger.debug(
             "simulated_order_placed",
             order_id=order.order_id,
             symbol=symbol,
-            side=side.value,
+            side=side.name.lower(),
             quantity=str(quantity),
             price=str(price) if price else None
         )
@@ -230,6 +408,9 @@ class SimulatedExchange:
         # Try immediate fill if we have an orderbook
         if self._current_book and self._current_book.symbol == symbol:
             self._try_fill_order(order, self._current_book)
+            # update_orderbook only revisits crossing orders, so drop it now
+            if order.status == OrderStatus.FILLED:
+                self._remove_open_order(order)
         
         if self._on_order_update:
             self._on_order_update(order)
@@ -255,10 +436,10 @@ class SimulatedExchange:
             return False
         
         order.status = OrderStatus.CANCELLED
-        order.updated_at = datetime.utcnow()
+        order.updated_at_ns = time.time_ns()
         
         if order_id in self._open_orders:
-            del self._open_orders[order_id]
+            self._remove_open_order(order)
         
         logger.debug("simulated_order_cancelled", order_id=order_id)
         
@@ -273,10 +454,43 @@ class SimulatedExchange:
     
     def get_open_orders(self, symbol: Optional[str] = None) -> List[SimulatedOrder]:
         """Get all open orders, optionally filtered by symbol."""
-        orders = list(self._open_orders.values())
         if symbol:
-            orders = [o for o in orders if o.symbol == symbol]
-        return orders
+            return list(self._open_by_symbol.get(symbol, {}).values())
+        return list(self._open_orders.values())
+    
+    def _next_order_id(self) -> str:
+        """Return a new order id, sequential unless use_uuid is set."""
+        if self.use_uuid:
+            return str(uuid4())
+        self._order_seq += 1
+        return f"o{self._order_seq}"
+    
+    def _next_fill_id(self) -> str:
+        """Return a new fill id, sequential unless use_uuid is set."""
+        if self.use_uuid:
+            return str(uuid4())
+        self._fill_seq += 1
+        return f"f{self._fill_seq}"
+    
+    def _remove_open_order(self, order: SimulatedOrder):
+        """Drop an order from the open-order map and its symbol/price indexes."""
+        del self._open_orders[order.order_id]
+        symbol_orders = self._open_by_symbol[order.symbol]
+        del symbol_orders[order.order_id]
+        if not symbol_orders:
+            del self._open_by_symbol[order.symbol]
+        
+        if order.order_type == OrderType.MARKET:
+            market_orders = self._resting_market[order.symbol]
+            del market_orders[order.order_id]
+            if not market_orders:
+                del self._resting_market[order.symbol]
+        else:
+            resting = self._resting_bids if order.side == OrderSide.BUY else self._resting_asks
+            levels = resting[order.symbol]
+            levels.remove(order)
+            if not levels:
+                del resting[order.symbol]
     
     def _try_fill_order(self, order: SimulatedOrder, book: OrderbookSnapshot):
         """
@@ -289,58 +503,70 @@ class SimulatedExchange:
         if order.status in (OrderStatus.FILLED, OrderStatus.CANCELLED):
             return
         
-        remaining = order.remaining_quantity
+        remaining = order.remaining_ticks
         if remaining <= 0:
             return
         
+        is_buy = order.side is OrderSide.BUY
+        is_limit = order.order_type is OrderType.LIMIT
+        
         # Get the relevant side of the book
-        if order.side == OrderSide.BUY:
-            levels = book.asks
+        if is_buy:
+            prices, qtys = book.ask_px, book.ask_qty
         else:
-            levels = book.bids
+            prices, qtys = book.bid_px, book.bid_qty
         
-        if not levels:
+        if not len(prices):
             return
         
+        price_ticks = to_ticks(prices, PRICE_SCALE)
+        qty_ticks = to_ticks(qtys, QTY_SCALE)
+        limit_ticks = order.price_ticks if is_limit else 0
+        
+        # Maker fill: a limit order resting inside the spread. This depends
+        # only on the limit against the opposite best (the first level of
+        # the side being consumed), not on the level being filled.
+        is_maker = (
+            is_limit and
+            book.best_ask_px is not None and book.best_bid_px is not None and
+            (limit_ticks < price_ticks[0] if is_buy else limit_ticks > price_ticks[0])
+        )
+        
+        # Fee rate as an exact integer ratio, so per-level fees are int math
+        fee_num, fee_den = self.fee_structure.get_fee(is_maker).as_integer_ratio()
+        fee_den *= QTY_SCALE
+        
         fills = []
         remaining_qty = remaining
         
-        for level in levels:
+        for level_price, level_qty in zip(price_ticks, qty_ticks):
             if remaining_qty <= 0:
                 break
             
             # Check price for limit orders
-            if order.order_type == OrderType.LIMIT:
-                if order.side == OrderSide.BUY:
+            if is_limit:
+                if is_buy:
                     # Can only fill if ask <= limit price
-                    if level.price > order.price:
+                    if level_price > limit_ticks:
                         break
                 else:
                     # Can only fill if bid >= limit price
-                    if level.price < order.price:
+                    if level_price < limit_ticks:
                         break
             
             # Calculate fill quantity
-            fill_qty = min(remaining_qty, level.quantity)
-            
-            # Check if this is a maker fill (limit order that provides liquidity)
-            is_maker = (
-                order.order_type == OrderType.LIMIT and
-                ((order.side == OrderSide.BUY and order.price < book.best_ask.price) or
-                 (order.side == OrderSide.SELL and order.price > book.best_bid.price))
-            ) if book.best_ask and book.best_bid else False
+            fill_qty = min(remaining_qty, level_qty)
             
-            # Calculate fee
-            fee_rate = self.fee_structure.get_fee(is_maker)
-            fee = fill_qty * level.price * fee_rate
+            # Calculate fee in price ticks
+            fee = fill_qty * level_price * fee_num // fee_den
             
             fill = SimulatedFill(
-                fill_id=str(uuid4()),
+                fill_id=self._next_fill_id(),
                 order_id=order.order_id,
-                timestamp=book.timestamp,
-                price=level.price,
-                quantity=fill_qty,
-                fee=fee,
+                timestamp_ns=book.timestamp_ns,
+                price_ticks=level_price,
+                qty_ticks=fill_qty,
+                fee_ticks=fee,
                 is_maker=is_maker
             )
             
@@ -369,9 +595,41 @@ class SimulatedExchange:
         """Reset all orders and state."""
         self._orders.clear()
         self._open_orders.clear()
+        self._open_by_symbol.clear()
+        self._resting_bids.clear()
+        self._resting_asks.clear()
+        self._resting_market.clear()
         self._current_book = None
 
 
+class SimClock:
+    """
+    Virtual clock for simulations.
+    
+    Waits advance the clock instead of sleeping, so time-based pacing
+    costs nothing in wall-clock time. The backtest driver decides when
+    the next orderbook update is delivered.
+    """
+    
+    def __init__(self, start_ns: int = 0):
+        """
+        Initialize clock.
+        
+        Args:
+            start_ns: Starting time as epoch nanoseconds
+        """
+        self.now_ns = start_ns
+    
+    @property
+    def now(self) -> datetime:
+        """Current virtual time (naive UTC)."""
+        return ns_to_timestamp(self.now_ns)
+    
+    def advance_ms(self, ms: int):
+        """Move the clock forward."""
+        self.now_ns += ms * 1_000_000
+
+
 class OrderSlicingSimulator:
     """
     Simulates order slicing as the real execution engine does.
@@ -385,6 +643,7 @@ class OrderSlicingSimulator:
         exchange: SimulatedExchange,
         slice_size_pct: Decimal = Decimal("5"),  # 5% of total
         slice_interval_ms: int = 100,  # 100ms between slices
+        clock: Optional[SimClock] = None,
     ):
         """
         Initialize slicer.
@@ -393,10 +652,14 @@ class OrderSlicingSimulator:
             exchange: Simulated exchange to place orders on
             slice_size_pct: Percentage of order per slice
             slice_interval_ms: Milliseconds between slices
+            clock: Virtual clock; slice intervals advance it instead of
+                sleeping and slices are stamped with its time. Without a
+                clock, slices are paced in wall-clock time.
         """
         self.exchange = exchange
         self.slice_size_pct = slice_size_pct
         self.slice_interval_ms = slice_interval_ms
+        self.clock = clock
     
     def calculate_slices(
         self,
@@ -413,16 +676,18 @@ class OrderSlicingSimulator:
         Returns:
             List of slice quantities
         """
-        slice_qty = total_quantity * (self.slice_size_pct / Decimal("100"))
-        slice_qty = max(slice_qty, min_slice_qty)
+        total_ticks = _decimal_to_ticks(total_quantity, QTY_SCALE)
+        slice_ticks = _decimal_to_ticks(total_quantity * (self.slice_size_pct / _HUNDRED), QTY_SCALE)
+        slice_ticks = max(slice_ticks, _decimal_to_ticks(min_slice_qty, QTY_SCALE))
         
-        slices = []
-        remaining = total_quantity
+        if total_ticks <= 0:
+            return []
         
-        while remaining > 0:
-            qty = min(slice_qty, remaining)
-            slices.append(qty)
-            remaining -= qty
+        # Equal full slices plus a smaller final slice for any remainder
+        n_full, remainder = divmod(total_ticks, slice_ticks)
+        slices = [Decimal(slice_ticks) / QTY_SCALE] * n_full
+        if remainder:
+            slices.append(Decimal(remainder) / QTY_SCALE)
         
         return slices
     
@@ -452,7 +717,7 @@ class OrderSlicingSimulator:
         
         for i, slice_qty in enumerate(slices):
             # Adjust price for each slice
-            tolerance = limit_price * (price_tolerance_bps * i / Decimal("10000"))
+            tolerance = limit_price * (price_tolerance_bps * i / _BPS)
             
             if side == OrderSide.BUY:
                 adjusted_price = limit_price + tolerance  # More aggressive
@@ -464,13 +729,18 @@ class OrderSlicingSimulator:
                 side=side,
                 order_type=OrderType.LIMIT,
                 quantity=slice_qty,
-                price=adjusted_price
+                price=adjusted_price,
+                timestamp=self.clock.now if self.clock else None
             )
             
             orders.append(order)
             
             # Wait between slices (simulated)
             if i < len(slices) - 1:
-                await asyncio.sleep(self.slice_interval_ms / 1000)
+                if self.clock:
+                    self.clock.advance_ms(self.slice_interval_ms)
+                    await asyncio.sleep(0)
+                else:
+                    await asyncio.sleep(self.slice_interval_ms / 1000)
         
         return orders
@@ -4,20 +4,33 @@ Slippage calculator for realistic trade simulation.
 Walks the orderbook to calculate actual execution prices and slippage.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Dict, Any, NamedTuple
 from enum import Enum
 
+import numpy as np
+
+from .kernels import FILL_TOLERANCE, walk_book, walk_books
 from .orderbook import OrderbookSnapshot, OrderbookLevel, OrderbookSide
 
+# Decimal constants, hoisted to avoid re-parsing literals in hot paths
+_ZERO = Decimal("0")
+_HUNDRED = Decimal("100")
+_BPS = Decimal("10000")
+
+
+def _to_decimal(value: float) -> Decimal:
+    """Convert a float computed on the book arrays to Decimal for results."""
+    return Decimal(str(value))
+
 
 class TradeSide(Enum):
     BUY = "buy"
     SELL = "sell"
 
 
-@dataclass
+@dataclass(slots=True)
 class SlippageResult:
     """
     Result of slippage calculation.
@@ -48,20 +61,79 @@ class SlippageResult:
         """Percentage of order filled."""
         total = self.filled_quantity + self.unfilled_quantity
         if total == 0:
-            return Decimal("0")
-        return (self.filled_quantity / total) * Decimal("100")
+            return _ZERO
+        return (self.filled_quantity / total) * _HUNDRED
+
+
+class TakerSlippage(NamedTuple):
+    """Float-only slippage summary for a taker order (see calculate_taker)."""
+    expected_price: float
+    actual_price: float
+    filled_quantity: float
+    total_cost: float
+    slippage_bps: float
+    insufficient_liquidity: bool
+
+
+@dataclass(slots=True)
+class SpreadSlippageResult:
+    """Execution details for both legs of a spread trade."""
+    long_exchange: str
+    short_exchange: str
+    size: float
+    long_leg: TakerSlippage
+    short_leg: TakerSlippage
+    spread_at_execution_bps: float
+    
+    @property
+    def total_slippage_bps(self) -> float:
+        """Combined slippage of both legs in basis points."""
+        return self.long_leg.slippage_bps + self.short_leg.slippage_bps
+    
+    @property
+    def can_execute(self) -> bool:
+        """Whether both legs can be filled in full."""
+        return not (self.long_leg.insufficient_liquidity or self.short_leg.insufficient_liquidity)
+    
+    def _leg_json(self, exchange: str, leg: TakerSlippage) -> Dict[str, Any]:
+        """Render one leg with decimal strings."""
+        return {
+            "exchange": exchange,
+            "expected_price": str(_to_decimal(leg.expected_price)),
+            "actual_price": str(_to_decimal(leg.actual_price)),
+            "slippage_bps": str(_to_decimal(leg.slippage_bps)),
+            "total_cost": str(_to_decimal(leg.total_cost)),
+            "filled": str(_to_decimal(leg.filled_quantity)),
+            "unfilled": str(_to_decimal(self.size - leg.filled_quantity)),
+            "insufficient_liquidity": leg.insufficient_liquidity,
+        }
+    
+    def to_json_dict(self) -> Dict[str, Any]:
+        """Convert to the API response shape, with decimal strings."""
+        return {
+            "long_leg": self._leg_json(self.long_exchange, self.long_leg),
+            "short_leg": self._leg_json(self.short_exchange, self.short_leg),
+            "spread_at_execution_bps": str(_to_decimal(self.spread_at_execution_bps)),
+            "total_slippage_bps": str(_to_decimal(self.total_slippage_bps)),
+            "can_execute": self.can_execute,
+        }
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class FeeStructure:
-    """Exchange fee structure."""
+    """Exchange fee structure (immutable; rates are precomputed)."""
     maker_fee_bps: Decimal = Decimal("2")   # 0.02% = 2 bps
     taker_fee_bps: Decimal = Decimal("5")   # 0.05% = 5 bps
+    _maker_rate: Decimal = field(init=False, repr=False, compare=False)
+    _taker_rate: Decimal = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        object.__setattr__(self, "_maker_rate", self.maker_fee_bps / _BPS)
+        object.__setattr__(self, "_taker_rate", self.taker_fee_bps / _BPS)
     
     def get_fee(self, is_maker: bool) -> Decimal:
         """Get fee rate as decimal (e.g., 0.0002 for 2 bps)."""
-        bps = self.maker_fee_bps if is_maker else self.taker_fee_bps
-        return bps / Decimal("10000")
+        return self._maker_rate if is_maker else self._taker_rate
 
 
 # Default fee structures per exchange
@@ -80,6 +152,89 @@ EXCHANGE_FEES = {
 }
 
 
+def _book_side(
+    orderbook: OrderbookSnapshot,
+    side: TradeSide
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Level arrays consumed by an order: buying takes asks, selling takes bids.
+    
+    Returns:
+        Tuple of (prices, quantities, cumulative quantity, cumulative notional)
+    """
+    if side == TradeSide.BUY:
+        prices, qtys, book_side = orderbook.ask_px, orderbook.ask_qty, OrderbookSide.ASK
+    else:
+        prices, qtys, book_side = orderbook.bid_px, orderbook.bid_qty, OrderbookSide.BID
+    return (
+        prices,
+        qtys,
+        orderbook.cumulative_qty(book_side),
+        orderbook.cumulative_notional(book_side),
+    )
+
+
+def _walk_levels(
+    prices: np.ndarray,
+    qtys: np.ndarray,
+    cum_qty: np.ndarray,
+    cum_notional: np.ndarray,
+    size: float
+) -> Tuple[float, float, int, float]:
+    """
+    Fill one order size against one book side via its cumulative depth.
+    
+    Returns:
+        Tuple of (filled quantity, notional, levels used, last level fill);
+        all levels used but the last are consumed in full.
+    """
+    # Levels up to the first whose cumulative quantity covers the order
+    n_levels = int(np.searchsorted(cum_qty, size)) + 1 if size > 0 else 0
+    if n_levels > len(cum_qty) and size - cum_qty[-1] <= size * FILL_TOLERANCE:
+        n_levels = len(cum_qty)
+    
+    if n_levels > len(cum_qty):
+        return float(cum_qty[-1]), float(cum_notional[-1]), len(cum_qty), float(qtys[-1])
+    if not n_levels:
+        return 0.0, 0.0, 0, 0.0
+    
+    prev_qty = float(cum_qty[n_levels - 2]) if n_levels > 1 else 0.0
+    prev_notional = float(cum_notional[n_levels - 2]) if n_levels > 1 else 0.0
+    last_fill = min(size - prev_qty, float(qtys[n_levels - 1]))
+    return size, prev_notional + last_fill * float(prices[n_levels - 1]), n_levels, last_fill
+
+
+def _fill_curve(
+    prices: np.ndarray,
+    cum_qty: np.ndarray,
+    cum_notional: np.ndarray,
+    sizes: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Filled quantity and notional for many order sizes via binary search.
+    
+    Args:
+        prices: Level prices, best first
+        cum_qty: Cumulative level quantities
+        cum_notional: Cumulative level price * quantity
+        sizes: Order sizes in base currency
+        
+    Returns:
+        Tuple of (filled quantity, filled notional), one entry per size
+    """
+    if not len(prices):
+        return np.zeros_like(sizes), np.zeros_like(sizes)
+    
+    filled = np.clip(sizes, 0.0, cum_qty[-1])
+    filled = np.where(sizes - filled <= sizes * FILL_TOLERANCE, np.maximum(sizes, 0.0), filled)
+    # Level holding the last unit filled; everything before it is fully consumed
+    idx = np.minimum(np.searchsorted(cum_qty, filled), len(cum_qty) - 1)
+    prev_qty = np.where(idx > 0, cum_qty[idx - 1], 0.0)
+    prev_notional = np.where(idx > 0, cum_notional[idx - 1], 0.0)
+    notional = prev_notional + (filled - prev_qty) * prices[idx]
+    return filled, notional
+
+
 class SlippageCalculator:
     """
     Calculates slippage by walking the orderbook.
@@ -96,11 +251,20 @@ class SlippageCalculator:
             default_fees: Default fee structure if exchange not found
         """
         self.default_fees = default_fees or FeeStructure()
+        # Taker fee in float bps per exchange name as given, for walk_book
+        self._taker_fee_bps: Dict[str, float] = {}
     
     def get_fees(self, exchange: str) -> FeeStructure:
         """Get fee structure for an exchange."""
         return EXCHANGE_FEES.get(exchange.lower(), self.default_fees)
     
+    def _get_taker_fee_bps(self, exchange: str) -> float:
+        """Taker fee for an exchange in float bps, resolved once per exchange name."""
+        fee_bps = self._taker_fee_bps.get(exchange)
+        if fee_bps is None:
+            fee_bps = self._taker_fee_bps[exchange] = float(self.get_fees(exchange).taker_fee_bps)
+        return fee_bps
+    
     def calculate(
         self,
         orderbook: OrderbookSnapshot,
@@ -123,48 +287,39 @@ class SlippageCalculator:
             SlippageResult with execution details
         """
         # Buying = consume asks, Selling = consume bids
-        levels = orderbook.asks if side == TradeSide.BUY else orderbook.bids
+        prices, qtys, cum_qty, cum_notional = _book_side(orderbook, side)
         
-        if not levels:
+        if not len(prices):
             return SlippageResult(
-                expected_price=Decimal("0"),
-                actual_price=Decimal("0"),
-                slippage_abs=Decimal("0"),
-                slippage_bps=Decimal("0"),
-                total_cost=Decimal("0"),
-                filled_quantity=Decimal("0"),
+                expected_price=_ZERO,
+                actual_price=_ZERO,
+                slippage_abs=_ZERO,
+                slippage_bps=_ZERO,
+                total_cost=_ZERO,
+                filled_quantity=_ZERO,
                 unfilled_quantity=size_in_coins,
                 fills=[],
                 insufficient_liquidity=True
             )
         
         # Best price (what we'd expect if infinite liquidity at top)
-        expected_price = levels[0].price
+        expected_price = float(prices[0])
         
         # Walk the book
-        remaining = size_in_coins
-        fills: List[Tuple[Decimal, Decimal]] = []
-        total_value = Decimal("0")
-        
-        for level in levels:
-            if remaining <= 0:
-                break
-            
-            fill_qty = min(remaining, level.quantity)
-            fills.append((level.price, fill_qty))
-            total_value += fill_qty * level.price
-            remaining -= fill_qty
-        
-        filled_quantity = size_in_coins - remaining
+        size = float(size_in_coins)
+        filled_quantity, total_value, n_levels, last_fill = _walk_levels(
+            prices, qtys, cum_qty, cum_notional, size
+        )
+        remaining = size - filled_quantity
         
-        if filled_quantity == 0:
+        if filled_quantity <= 0:
             return SlippageResult(
-                expected_price=expected_price,
-                actual_price=Decimal("0"),
-                slippage_abs=Decimal("0"),
-                slippage_bps=Decimal("0"),
-                total_cost=Decimal("0"),
-                filled_quantity=Decimal("0"),
+                expected_price=_to_decimal(expected_price),
+                actual_price=_ZERO,
+                slippage_abs=_ZERO,
+                slippage_bps=_ZERO,
+                total_cost=_ZERO,
+                filled_quantity=_ZERO,
                 unfilled_quantity=size_in_coins,
                 fills=[],
                 insufficient_liquidity=True
@@ -173,34 +328,250 @@ class SlippageCalculator:
         # Volume-weighted average price
         actual_price = total_value / filled_quantity
         
-        # Slippage calculation
-        if side == TradeSide.BUY:
-            slippage_abs = actual_price - expected_price
-        else:
-            slippage_abs = expected_price - actual_price  # For sells, we want higher price
+        # Slippage magnitude; the walk only ever moves the price against us
+        slippage_abs = abs(actual_price - expected_price)
         
-        slippage_bps = (slippage_abs / expected_price) * Decimal("10000") if expected_price > 0 else Decimal("0")
+        slippage_bps = (slippage_abs / expected_price) * 10000.0 if expected_price > 0 else 0.0
         
         # Calculate total cost including fees
         total_cost = total_value
         if include_fees:
             fees = self.get_fees(orderbook.exchange)
-            fee_rate = fees.get_fee(is_maker=not is_aggressive)
-            fee_amount = total_value * fee_rate
-            total_cost += fee_amount
+            fee_rate = float(fees.get_fee(is_maker=not is_aggressive))
+            total_cost += total_value * fee_rate
         
         return SlippageResult(
-            expected_price=expected_price,
-            actual_price=actual_price,
-            slippage_abs=abs(slippage_abs),
-            slippage_bps=abs(slippage_bps),
-            total_cost=total_cost,
-            filled_quantity=filled_quantity,
-            unfilled_quantity=remaining,
-            fills=fills,
+            expected_price=_to_decimal(expected_price),
+            actual_price=_to_decimal(actual_price),
+            slippage_abs=_to_decimal(slippage_abs),
+            slippage_bps=_to_decimal(slippage_bps),
+            total_cost=_to_decimal(total_cost),
+            filled_quantity=_to_decimal(filled_quantity),
+            unfilled_quantity=_to_decimal(remaining),
+            fills=self._level_fills(prices, qtys, n_levels, last_fill),
             insufficient_liquidity=remaining > 0
         )
     
+    def calculate_taker(
+        self,
+        orderbook: OrderbookSnapshot,
+        side: TradeSide,
+        size: float,
+        include_fees: bool = True
+    ) -> TakerSlippage:
+        """
+        Calculate taker-order slippage in floats only.
+        
+        Same fill as calculate() without the Decimal result fields or the
+        fills list, for callers that only need prices, cost and liquidity.
+        
+        Args:
+            orderbook: Current orderbook snapshot
+            side: BUY or SELL
+            size: Size of order in base currency
+            include_fees: Whether to include exchange (taker) fees
+            
+        Returns:
+            TakerSlippage with execution details
+        """
+        # Single pass in the walk_book kernel: one-off orders don't pay for
+        # the snapshot's full cumulative depth arrays
+        if side == TradeSide.BUY:
+            prices, qtys = orderbook.ask_px, orderbook.ask_qty
+        else:
+            prices, qtys = orderbook.bid_px, orderbook.bid_qty
+        if not len(prices):
+            return TakerSlippage(0.0, 0.0, 0.0, 0.0, 0.0, True)
+        
+        expected_price = float(prices[0])
+        fee_bps = self._get_taker_fee_bps(orderbook.exchange) if include_fees else 0.0
+        filled_quantity, total_value, total_cost, unfilled = walk_book(prices, qtys, size, fee_bps)
+        if filled_quantity <= 0:
+            return TakerSlippage(expected_price, 0.0, 0.0, 0.0, 0.0, True)
+        
+        actual_price = total_value / filled_quantity
+        slippage_bps = (
+            abs(actual_price - expected_price) / expected_price * 10000.0 if expected_price > 0 else 0.0
+        )
+        
+        return TakerSlippage(
+            expected_price,
+            actual_price,
+            filled_quantity,
+            total_cost,
+            slippage_bps,
+            unfilled > 0
+        )
+    
+    @staticmethod
+    def _level_fills(
+        prices: np.ndarray,
+        qtys: np.ndarray,
+        n_levels: int,
+        last_fill: float
+    ) -> List[Tuple[Decimal, Decimal]]:
+        """(price, quantity) fills for the first n_levels, the last one partial."""
+        fills = [
+            (_to_decimal(p), _to_decimal(q))
+            for p, q in zip(prices[:n_levels].tolist(), qtys[:n_levels].tolist())
+        ]
+        fills[-1] = (fills[-1][0], _to_decimal(last_fill))
+        return fills
+    
+    def calculate_batch(
+        self,
+        orderbook: OrderbookSnapshot,
+        side: TradeSide,
+        sizes: np.ndarray,
+        include_fees: bool = True,
+        is_aggressive: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Calculate slippage for many order sizes against one orderbook side.
+        
+        Equivalent to calling calculate() per size, but the book is walked
+        once and every size is answered with a binary search.
+        
+        Args:
+            orderbook: Current orderbook snapshot
+            side: BUY or SELL
+            sizes: Order sizes in base currency
+            include_fees: Whether to include exchange fees
+            is_aggressive: True for taker orders (market-crossing)
+            
+        Returns:
+            Dictionary of float arrays aligned with sizes (expected_price is
+            a scalar)
+        """
+        sizes = np.asarray(sizes, dtype=np.float64)
+        prices, _, cum_qty, cum_notional = _book_side(orderbook, side)
+        
+        expected_price = float(prices[0]) if len(prices) else 0.0
+        filled, notional = _fill_curve(prices, cum_qty, cum_notional, sizes)
+        has_fill = filled > 0
+        
+        actual_price = np.divide(
+            notional, filled, out=np.zeros_like(notional), where=has_fill
+        )
+        if expected_price > 0:
+            slippage_bps = np.where(
+                has_fill, np.abs(actual_price - expected_price) / expected_price * 10000.0, 0.0
+            )
+        else:
+            slippage_bps = np.zeros_like(actual_price)
+        
+        total_cost = notional
+        if include_fees:
+            fee_rate = float(self.get_fees(orderbook.exchange).get_fee(is_maker=not is_aggressive))
+            total_cost = notional + notional * fee_rate
+        
+        unfilled = np.where(has_fill, sizes - filled, sizes)
+        
+        return {
+            "expected_price": expected_price,
+            "actual_price": actual_price,
+            "slippage_bps": slippage_bps,
+            "total_cost": total_cost,
+            "filled": filled,
+            "unfilled": unfilled,
+            "insufficient_liquidity": (unfilled > 0) | ~has_fill,
+        }
+    
+    def calculate_books(
+        self,
+        orderbooks: List[OrderbookSnapshot],
+        side: TradeSide,
+        sizes: np.ndarray,
+        include_fees: bool = True,
+        is_aggressive: bool = True,
+        as_results: bool = False
+    ) -> Any:
+        """
+        Calculate slippage for one order per orderbook, in parallel.
+        
+        Intended for sweeps over many symbols, timestamps and sizes: the
+        book sides are packed into flat arrays and walked by the
+        walk_books kernel across threads.
+        
+        Args:
+            orderbooks: Orderbook snapshots, one per order
+            side: BUY or SELL
+            sizes: Order size in base currency for each orderbook
+            include_fees: Whether to include exchange fees
+            is_aggressive: True for taker orders (market-crossing)
+            as_results: Return SlippageResult objects instead of arrays
+            
+        Returns:
+            Dictionary of float arrays aligned with orderbooks, in the
+            calculate_batch layout, or a list of SlippageResult (with empty
+            fills) if as_results is set
+        """
+        sizes = np.asarray(sizes, dtype=np.float64)
+        if len(sizes) != len(orderbooks):
+            raise ValueError("sizes must have one entry per orderbook")
+        
+        if side == TradeSide.BUY:
+            sides = [(book.ask_px, book.ask_qty) for book in orderbooks]
+        else:
+            sides = [(book.bid_px, book.bid_qty) for book in orderbooks]
+        
+        lens = np.array([len(px) for px, _ in sides], dtype=np.int64)
+        starts = np.zeros(len(lens), dtype=np.int64)
+        np.cumsum(lens[:-1], out=starts[1:])
+        prices = np.concatenate([px for px, _ in sides]) if sides else np.empty(0)
+        qtys = np.concatenate([qty for _, qty in sides]) if sides else np.empty(0)
+        
+        actual_price, filled = walk_books(prices, qtys, starts, lens, sizes)
+        
+        has_levels = lens > 0
+        expected_price = np.zeros(len(lens))
+        expected_price[has_levels] = prices[starts[has_levels]]
+        
+        has_fill = filled > 0
+        slippage_bps = np.zeros(len(lens))
+        priced = has_fill & (expected_price > 0)
+        slippage_bps[priced] = (
+            np.abs(actual_price[priced] - expected_price[priced]) / expected_price[priced] * 10000.0
+        )
+        
+        notional = actual_price * filled
+        total_cost = notional
+        if include_fees:
+            fee_rates = np.array([
+                float(self.get_fees(book.exchange).get_fee(is_maker=not is_aggressive))
+                for book in orderbooks
+            ])
+            total_cost = notional + notional * fee_rates
+        
+        unfilled = np.where(has_fill, sizes - filled, sizes)
+        insufficient_liquidity = (unfilled > 0) | ~has_fill
+        
+        if not as_results:
+            return {
+                "expected_price": expected_price,
+                "actual_price": actual_price,
+                "slippage_bps": slippage_bps,
+                "total_cost": total_cost,
+                "filled": filled,
+                "unfilled": unfilled,
+                "insufficient_liquidity": insufficient_liquidity,
+            }
+        
+        return [
+            SlippageResult(
+                expected_price=_to_decimal(expected_price[i]),
+                actual_price=_to_decimal(actual_price[i]),
+                slippage_abs=_to_decimal(abs(actual_price[i] - expected_price[i]) if has_fill[i] else 0.0),
+                slippage_bps=_to_decimal(slippage_bps[i]),
+                total_cost=_to_decimal(total_cost[i]),
+                filled_quantity=_to_decimal(filled[i]),
+                unfilled_quantity=_to_decimal(unfilled[i]),
+                fills=[],
+                insufficient_liquidity=bool(insufficient_liquidity[i])
+            )
+            for i in range(len(orderbooks))
+        ]
+    
     def calculate_round_trip(
         self,
         entry_book: OrderbookSnapshot,
@@ -252,12 +623,63 @@ class SlippageCalculator:
         return entry_result, exit_result, total_pnl
 
 
+# Shared by the module-level helpers; the calculator holds no per-call state
+_DEFAULT_CALCULATOR = SlippageCalculator()
+
+
+def calculate_spread_slippage_batch(
+    long_book: OrderbookSnapshot,
+    short_book: OrderbookSnapshot,
+    sizes: np.ndarray,
+    include_fees: bool = True
+) -> Dict[str, Any]:
+    """
+    Calculate spread trade slippage for many position sizes at once.
+    
+    Each book is walked once; per-size results come from binary searches
+    over cumulative depth, so a size sweep costs O(levels + sizes).
+    
+    Args:
+        long_book: Orderbook for long leg (buying)
+        short_book: Orderbook for short leg (selling)
+        sizes: Position sizes per leg
+        include_fees: Whether to include fees
+        
+    Returns:
+        Dictionary shaped like calculate_spread_slippage, holding arrays
+        aligned with sizes
+    """
+    calc = _DEFAULT_CALCULATOR
+    
+    long_leg = calc.calculate_batch(long_book, TradeSide.BUY, sizes, include_fees)
+    short_leg = calc.calculate_batch(short_book, TradeSide.SELL, sizes, include_fees)
+    
+    long_px = long_leg["actual_price"]
+    short_px = short_leg["actual_price"]
+    
+    # Spread at execution prices
+    spread_bps = np.divide(
+        (short_px - long_px) * 10000.0,
+        long_px,
+        out=np.zeros_like(long_px),
+        where=(long_px > 0) & (short_px > 0)
+    )
+    
+    return {
+        "long_leg": {"exchange": long_book.exchange, **long_leg},
+        "short_leg": {"exchange": short_book.exchange, **short_leg},
+        "spread_at_execution_bps": spread_bps,
+        "total_slippage_bps": long_leg["slippage_bps"] + short_leg["slippage_bps"],
+        "can_execute": ~(long_leg["insufficient_liquidity"] | short_leg["insufficient_liquidity"]),
+    }
+
+
 def calculate_spread_slippage(
     long_book: OrderbookSnapshot,
     short_book: OrderbookSnapshot,
     size_in_coins: Decimal,
     include_fees: bool = True
-) -> dict:
+) -> SpreadSlippageResult:
     """
     Calculate total slippage for a spread trade (long one exchange, short another).
     
@@ -268,48 +690,26 @@ def calculate_spread_slippage(
         include_fees: Whether to include fees
         
     Returns:
-        Dictionary with execution details for both legs
+        SpreadSlippageResult with execution details for both legs
     """
-    calc = SlippageCalculator()
+    calc = _DEFAULT_CALCULATOR
+    size = float(size_in_coins)
     
-    # Long leg: buying
-    long_result = calc.calculate(
-        long_book, TradeSide.BUY, size_in_coins, include_fees
-    )
-    
-    # Short leg: selling
-    short_result = calc.calculate(
-        short_book, TradeSide.SELL, size_in_coins, include_fees
-    )
+    # Long leg: buying; short leg: selling
+    long_leg = calc.calculate_taker(long_book, TradeSide.BUY, size, include_fees)
+    short_leg = calc.calculate_taker(short_book, TradeSide.SELL, size, include_fees)
     
     # Spread at execution prices
-    if long_result.actual_price > 0 and short_result.actual_price > 0:
-        spread_bps = ((short_result.actual_price - long_result.actual_price) / long_result.actual_price) * Decimal("10000")
+    if long_leg.actual_price > 0 and short_leg.actual_price > 0:
+        spread_bps = (short_leg.actual_price - long_leg.actual_price) / long_leg.actual_price * 10000.0
     else:
-        spread_bps = Decimal("0")
+        spread_bps = 0.0
     
-    return {
-        "long_leg": {
-            "exchange": long_book.exchange,
-            "expected_price": str(long_result.expected_price),
-            "actual_price": str(long_result.actual_price),
-            "slippage_bps": str(long_result.slippage_bps),
-            "total_cost": str(long_result.total_cost),
-            "filled": str(long_result.filled_quantity),
-            "unfilled": str(long_result.unfilled_quantity),
-            "insufficient_liquidity": long_result.insufficient_liquidity,
-        },
-        "short_leg": {
-            "exchange": short_book.exchange,
-            "expected_price": str(short_result.expected_price),
-            "actual_price": str(short_result.actual_price),
-            "slippage_bps": str(short_result.slippage_bps),
-            "total_cost": str(short_result.total_cost),
-            "filled": str(short_result.filled_quantity),
-            "unfilled": str(short_result.unfilled_quantity),
-            "insufficient_liquidity": short_result.insufficient_liquidity,
-        },
-        "spread_at_execution_bps": str(spread_bps),
-        "total_slippage_bps": str(long_result.slippage_bps + short_result.slippage_bps),
-        "can_execute": not (long_result.insufficient_liquidity or short_result.insufficient_liquidity),
-    }
+    return SpreadSlippageResult(
+        long_exchange=long_book.exchange,
+        short_exchange=short_book.exchange,
+        size=size,
+        long_leg=long_leg,
+        short_leg=short_leg,
+        spread_at_execution_bps=spread_bps,
+    )
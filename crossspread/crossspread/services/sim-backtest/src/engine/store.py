@@ -0,0 +1,258 @@
+"""
+Redis-backed storage for backtest runs.
+
+Each run is a hash at bt:{backtest_id} that expires after a TTL, and the
+sorted set bt:index orders run IDs by their last status change so recent
+runs are listed without scanning. Reports are kept as compressed pickles
+so any worker can serve them; recently used reports, with their trade
+lists serialized once, are also held in a small in-process LRU cache.
+"""
+
+import pickle
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+import redis.asyncio as redis
+from structlog import get_logger
+
+from .report import BacktestReport
+
+logger = get_logger(__name__)
+
+BACKTEST_TTL_SECONDS = 86400
+HOT_REPORT_CACHE_SIZE = 64
+
+# How often the service calls prune()
+PRUNE_INTERVAL_SECONDS = 300
+
+_INDEX_KEY = "bt:index"
+_STATUS_FIELDS = ("status", "started_at", "completed_at", "error")
+
+
+def _key(backtest_id: str) -> str:
+    return f"bt:{backtest_id}"
+
+
+def _parse_time(value: Optional[bytes]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.decode()) if value else None
+
+
+@dataclass(slots=True)
+class _HotReport:
+    """In-process cache entry: a report and its trade dicts once built."""
+    report: BacktestReport
+    trades: Optional[Tuple[Dict[str, Any], ...]] = None
+
+
+class BacktestStore:
+    """
+    Backtest status, summaries and reports shared through Redis.
+    """
+    
+    def __init__(
+        self,
+        redis_url: str,
+        ttl_seconds: int = BACKTEST_TTL_SECONDS,
+        hot_reports: int = HOT_REPORT_CACHE_SIZE
+    ):
+        """
+        Initialize store.
+        
+        Args:
+            redis_url: Redis connection URL
+            ttl_seconds: How long a run is kept after its last update
+            hot_reports: Number of reports cached in process
+        """
+        self._redis = redis.from_url(redis_url)
+        self._ttl = ttl_seconds
+        self._hot_reports = hot_reports
+        self._hot: "OrderedDict[str, _HotReport]" = OrderedDict()
+    
+    async def close(self):
+        """Close the Redis connection pool."""
+        await self._redis.aclose()
+    
+    async def _write(self, backtest_id: str, fields: Dict[str, Any], updated_at: datetime):
+        """Write run fields, refresh the TTL and re-rank the run in the index."""
+        key = _key(backtest_id)
+        score = updated_at.timestamp()
+        async with self._redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=fields)
+            pipe.expire(key, self._ttl)
+            pipe.zadd(_INDEX_KEY, {backtest_id: score})
+            # Index entries of runs whose hash has expired
+            pipe.zremrangebyscore(_INDEX_KEY, "-inf", score - self._ttl)
+            await pipe.execute()
+    
+    async def mark_running(self, backtest_id: str, started_at: datetime):
+        """Record a run as started."""
+        await self._write(
+            backtest_id,
+            {"status": "running", "started_at": started_at.isoformat()},
+            started_at
+        )
+    
+    async def mark_completed(
+        self,
+        backtest_id: str,
+        completed_at: datetime,
+        summary: Dict[str, Any],
+        report: BacktestReport
+    ):
+        """
+        Record a run as completed.
+        
+        Args:
+            backtest_id: Run ID
+            completed_at: Completion time
+            summary: JSON-serializable result summary
+            report: Generated report
+        """
+        blob = zlib.compress(pickle.dumps(report, protocol=pickle.HIGHEST_PROTOCOL))
+        await self._write(
+            backtest_id,
+            {
+                "status": "completed",
+                "completed_at": completed_at.isoformat(),
+                "summary": orjson.dumps(summary),
+                "report": blob,
+            },
+            completed_at
+        )
+        self._remember(backtest_id, report).trades = tuple(report.to_trades_list())
+        logger.debug("backtest_stored", backtest_id=backtest_id, report_bytes=len(blob))
+    
+    async def mark_failed(self, backtest_id: str, completed_at: datetime, error: str):
+        """Record a run as failed."""
+        await self._write(
+            backtest_id,
+            {"status": "failed", "completed_at": completed_at.isoformat(), "error": error},
+            completed_at
+        )
+    
+    async def get(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the status of a run.
+        
+        Returns:
+            Dict with status, started_at, completed_at and error, or None
+            if the run is unknown or expired
+        """
+        status, started_at, completed_at, error = await self._redis.hmget(
+            _key(backtest_id), _STATUS_FIELDS
+        )
+        if status is None:
+            return None
+        return {
+            "status": status.decode(),
+            "started_at": _parse_time(started_at),
+            "completed_at": _parse_time(completed_at),
+            "error": error.decode() if error else None,
+        }
+    
+    async def get_summary(self, backtest_id: str) -> Optional[Dict[str, Any]]:
+        """Get the result summary of a completed run."""
+        summary = await self._redis.hget(_key(backtest_id), "summary")
+        return orjson.loads(summary) if summary else None
+    
+    async def get_report(self, backtest_id: str) -> Optional[BacktestReport]:
+        """Get the report of a completed run, from the in-process cache if possible."""
+        hot = await self._get_hot(backtest_id)
+        return hot.report if hot else None
+    
+    async def get_trades(self, backtest_id: str) -> Optional[Tuple[Dict[str, Any], ...]]:
+        """
+        Get the trades of a completed run as dicts (see BacktestReport.to_trades_list).
+        
+        The list is built once per cached report, so paginated reads are
+        plain slices.
+        """
+        hot = await self._get_hot(backtest_id)
+        if hot is None:
+            return None
+        
+        if hot.trades is None:
+            hot.trades = tuple(hot.report.to_trades_list())
+        return hot.trades
+    
+    async def list_recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        List the most recently updated runs, newest first.
+        
+        Args:
+            limit: Maximum number of runs
+        
+        Returns:
+            List of dicts with backtest_id plus the fields from get(),
+            except that times are the stored ISO-8601 strings rather than
+            datetimes, ready to serialize
+        """
+        ids = await self._redis.zrevrange(_INDEX_KEY, 0, limit - 1)
+        if not ids:
+            return []
+        
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for backtest_id in ids:
+                pipe.hmget(_key(backtest_id.decode()), _STATUS_FIELDS)
+            rows = await pipe.execute()
+        
+        backtests = []
+        for backtest_id, (status, started_at, completed_at, error) in zip(ids, rows):
+            if status is None:
+                continue
+            backtests.append({
+                "backtest_id": backtest_id.decode(),
+                "status": status.decode(),
+                "started_at": started_at.decode() if started_at else None,
+                "completed_at": completed_at.decode() if completed_at else None,
+                "error": error.decode() if error else None,
+            })
+        return backtests
+    
+    async def prune(self):
+        """
+        Drop expired runs from the index and the in-process report cache.
+        
+        Run hashes expire in Redis on their own; this removes what still
+        refers to them, so memory stays bounded between writes.
+        """
+        cutoff = datetime.utcnow().timestamp() - self._ttl
+        hot_ids = list(self._hot)
+        
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(_INDEX_KEY, "-inf", cutoff)
+            for backtest_id in hot_ids:
+                pipe.exists(_key(backtest_id))
+            unindexed, *exists = await pipe.execute()
+        
+        expired = [backtest_id for backtest_id, alive in zip(hot_ids, exists) if not alive]
+        for backtest_id in expired:
+            self._hot.pop(backtest_id, None)
+        
+        if unindexed or expired:
+            logger.info("backtest_store_pruned", unindexed=unindexed, reports_dropped=len(expired))
+    
+    async def _get_hot(self, backtest_id: str) -> Optional[_HotReport]:
+        """Get a run's cache entry, loading the report from Redis on a miss."""
+        hot = self._hot.get(backtest_id)
+        if hot is not None:
+            self._hot.move_to_end(backtest_id)
+            return hot
+        
+        blob = await self._redis.hget(_key(backtest_id), "report")
+        if blob is None:
+            return None
+        
+        return self._remember(backtest_id, pickle.loads(zlib.decompress(blob)))
+    
+    def _remember(self, backtest_id: str, report: BacktestReport) -> _HotReport:
+        """Add a report to the in-process LRU cache."""
+        hot = self._hot[backtest_id] = _HotReport(report)
+        self._hot.move_to_end(backtest_id)
+        while len(self._hot) > self._hot_reports:
+            self._hot.popitem(last=False)
+        return hot
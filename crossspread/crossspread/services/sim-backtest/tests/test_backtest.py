@@ -0,0 +1,57 @@
+"""Merging per-symbol backtests in BacktestEngine.run_parallel."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+
+from engine import backtest
+from engine.backtest import BacktestConfig, BacktestEngine, BacktestResult, SpreadTrade
+
+
+class _ThreadPoolExecutor(ThreadPoolExecutor):
+    def __init__(self, max_workers=None, mp_context=None):
+        super().__init__(max_workers)
+
+
+def _run_backtest(config):
+    start = config.start_time
+    result = BacktestResult(config=config)
+    for k, pnl in enumerate([5.0, -2.0, 3.0]):
+        result.trades.append(SpreadTrade(
+            trade_id=f"t{k}",
+            canonical_symbol=config.symbols[0],
+            long_exchange="binance",
+            short_exchange="bybit",
+            entry_time=start,
+            size_in_coins=1.0,
+            exit_time=start + timedelta(minutes=k + 1),
+            net_pnl=pnl,
+            is_open=False,
+        ))
+    timestamps = np.array([backtest.timestamp_to_ns(start + timedelta(minutes=k + 1)) for k in range(3)])
+    return result, timestamps, np.cumsum([5.0, -2.0, 3.0])
+
+
+def test_run_parallel_leaves_engine_state_alone(monkeypatch):
+    monkeypatch.setattr(backtest, "ProcessPoolExecutor", _ThreadPoolExecutor)
+    monkeypatch.setattr(backtest, "run_backtest_process", _run_backtest)
+    engine = BacktestEngine(BacktestConfig(
+        start_time=datetime(2024, 1, 1),
+        end_time=datetime(2024, 1, 2),
+        exchanges=["binance", "bybit"],
+        symbols=["BTC-USDT-PERP", "ETH-USDT-PERP"],
+        size_in_coins=Decimal("1"),
+    ))
+    
+    first = asyncio.run(engine.run_parallel(2))
+    second = asyncio.run(engine.run_parallel(2))
+    
+    assert first.total_trades == 6
+    assert first.max_drawdown == Decimal("4.0")
+    assert first.sharpe_ratio is not None
+    assert (second.sharpe_ratio, second.sortino_ratio) == (first.sharpe_ratio, first.sortino_ratio)
+    assert len(engine.equity_curve["equity"]) == 0
+    assert engine.current_equity == engine.peak_equity == 0.0
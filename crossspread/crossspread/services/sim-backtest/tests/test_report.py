@@ -0,0 +1,88 @@
+"""Trade exports of backtest reports."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from engine.backtest import BacktestConfig, BacktestResult, SpreadTrade
+from engine.report import ReportGenerator
+
+
+def _report(generator: ReportGenerator, trades):
+    start = datetime(2024, 1, 1)
+    config = BacktestConfig(
+        start_time=start,
+        end_time=start + timedelta(days=1),
+        exchanges=["binance", "bybit"],
+        symbols=["BTC-USDT-PERP"],
+        size_in_coins=Decimal("1"),
+    )
+    return generator.generate(BacktestResult(config=config, trades=trades))
+
+
+def _trades():
+    entry = datetime(2024, 1, 1, 12)
+    return [
+        SpreadTrade(
+            trade_id="t1",
+            canonical_symbol="BTC-USDT-PERP",
+            long_exchange="binance",
+            short_exchange="bybit",
+            entry_time=entry,
+            size_in_coins=1e-05,
+            long_entry_price=1e+17,
+            short_entry_price=1.2345e-05,
+            entry_spread_bps=12.5,
+            exit_time=entry + timedelta(seconds=30),
+            long_exit_price=100.25,
+            short_exit_price=100.5,
+            exit_spread_bps=0.1,
+            gross_pnl=0.1 + 0.2,
+            fees=3e-07,
+            net_pnl=-1.5,
+            is_open=False,
+        ),
+        SpreadTrade(
+            trade_id="t2",
+            canonical_symbol="BTC-USDT-PERP",
+            long_exchange="binance",
+            short_exchange="bybit",
+            entry_time=entry,
+            size_in_coins=2.0,
+            long_entry_price=100.0,
+        ),
+        SpreadTrade(
+            trade_id="t3",
+            canonical_symbol="BTC-USDT-PERP",
+            long_exchange="binance",
+            short_exchange="bybit",
+            entry_time=entry,
+            size_in_coins=1.0,
+            long_entry_price=100.0,
+            short_entry_price=100.5,
+            exit_time=entry,
+            long_exit_price=100.0,
+            short_exit_price=100.5,
+            is_open=False,
+        ),
+    ]
+
+
+def test_saved_csv_matches_streamed_csv(tmp_path):
+    generator = ReportGenerator(str(tmp_path))
+    report = _report(generator, _trades())
+    
+    path = generator.save_csv(report, "trades.csv")
+    
+    with open(path, newline="") as f:
+        assert f.read() == "".join(ReportGenerator.iter_csv(report))
+
+
+def test_packed_rows_match_trades_iter(tmp_path):
+    generator = ReportGenerator(str(tmp_path))
+    expected = list(_report(generator, _trades()).trades_iter())
+    
+    report = _report(generator, _trades())
+    report.pack_trades()
+    
+    assert list(report.packed_trades.rows()) == expected
+    assert list(report.trades_iter()) == expected
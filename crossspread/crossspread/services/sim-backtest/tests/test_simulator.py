@@ -0,0 +1,31 @@
+"""Order lifecycle in the simulated exchange."""
+
+from datetime import datetime
+from decimal import Decimal
+
+from engine.orderbook import OrderbookSnapshot
+from engine.simulator import OrderSide, OrderStatus, OrderType, SimulatedExchange
+
+
+def _book(ask: float) -> OrderbookSnapshot:
+    return OrderbookSnapshot.from_levels(
+        exchange="binance",
+        symbol="BTC-USDT-PERP",
+        timestamp=datetime(2024, 1, 1),
+        bids=[[ask - 1.0, 10.0]],
+        asks=[[ask, 10.0]],
+    )
+
+
+def test_immediately_filled_order_leaves_open_orders():
+    exchange = SimulatedExchange("binance")
+    exchange.update_orderbook(_book(101.0))
+    
+    order = exchange.place_order(
+        "BTC-USDT-PERP", OrderSide.BUY, OrderType.LIMIT, Decimal("1"), price=Decimal("102")
+    )
+    assert order.status == OrderStatus.FILLED
+    assert exchange.get_open_orders() == []
+    
+    exchange.update_orderbook(_book(200.0))
+    assert exchange.get_open_orders() == []
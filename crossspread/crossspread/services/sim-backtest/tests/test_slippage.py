@@ -0,0 +1,54 @@
+"""Orderbook walks in the slippage calculator."""
+
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+
+from engine.orderbook import OrderbookSnapshot
+from engine.slippage import SlippageCalculator, TradeSide
+
+
+def _book() -> OrderbookSnapshot:
+    # 0.1 + 0.7 sums to 0.7999999999999999 in floats
+    return OrderbookSnapshot.from_levels(
+        exchange="binance",
+        symbol="BTC-USDT-PERP",
+        timestamp=datetime(2024, 1, 1),
+        bids=[[99.0, 1.0]],
+        asks=[[100.0, 0.1], [101.0, 0.7]],
+    )
+
+
+def test_order_using_exact_depth_fills():
+    result = SlippageCalculator().calculate(_book(), TradeSide.BUY, Decimal("0.8"))
+    
+    assert not result.insufficient_liquidity
+    assert result.filled_quantity == Decimal("0.8")
+    assert result.unfilled_quantity == 0
+    assert result.fills == [(Decimal("100.0"), Decimal("0.1")), (Decimal("101.0"), Decimal("0.7"))]
+
+
+def test_batch_order_using_exact_depth_fills():
+    result = SlippageCalculator().calculate_batch(_book(), TradeSide.BUY, np.array([0.8, 0.9]))
+    
+    assert result["insufficient_liquidity"].tolist() == [False, True]
+    assert result["filled"][0] == 0.8
+    assert result["unfilled"][0] == 0.0
+
+
+def test_taker_order_using_exact_depth_fills():
+    result = SlippageCalculator().calculate_taker(_book(), TradeSide.BUY, 0.8)
+    
+    assert not result.insufficient_liquidity
+    assert result.filled_quantity == 0.8
+
+
+def test_books_order_using_exact_depth_fills():
+    result = SlippageCalculator().calculate_books(
+        [_book(), _book()], TradeSide.BUY, np.array([0.8, 0.9])
+    )
+    
+    assert result["insufficient_liquidity"].tolist() == [False, True]
+    assert result["filled"][0] == 0.8
+    assert result["unfilled"][0] == 0.0